@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+
+class TranslationCheckpoint:
+    """
+    Point de contrôle d'une traduction longue, enregistré à côté du fichier de sortie.
+
+    Le fichier est au format JSON Lines : une première ligne d'en-tête identifiant
+    le travail (empreinte des paramètres), puis une ligne par segment traduit
+    indexée par position et empreinte du texte source.
+    """
+
+    SUFFIX = '.checkpoint'
+
+    def __init__(self, output_path: Path, job_parameters: dict):
+        output_path = Path(output_path)
+        self.path = output_path.with_name(output_path.name + self.SUFFIX)
+        self.job_id = hashlib.sha256(
+            json.dumps(job_parameters, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        self.completed = {}
+        self.recorded = 0
+        self._valid_size = 0
+        self._file = None
+
+    @staticmethod
+    def segment_hash(text: str) -> str:
+        """Empreinte du texte source d'un segment."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def load(self) -> int:
+        """
+        Charge les segments terminés d'une exécution précédente du même travail.
+
+        Un point de contrôle d'un autre travail est ignoré. Une ligne tronquée
+        (arrêt brutal pendant l'écriture) termine la lecture : le fichier sera
+        coupé à la fin de la dernière ligne valide avant d'y ajouter la suite.
+
+        Returns:
+            int: Nombre de segments disponibles pour la reprise
+        """
+        self.completed = {}
+        self._valid_size = 0
+        if not self.path.exists():
+            return 0
+
+        with open(self.path, 'rb') as f:
+            line = f.readline()
+            try:
+                header = json.loads(line or b'{}')
+            except json.JSONDecodeError:
+                return 0
+            if header.get('job') != self.job_id or not line.endswith(b'\n'):
+                return 0
+            valid_size = len(line)
+
+            for line in f:
+                # Une ligne sans fin de ligne est incomplète, même si son début se lit en JSON
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.completed[entry['index']] = (entry['hash'], entry['translation'])
+                valid_size += len(line)
+
+        self._valid_size = valid_size
+
+        return len(self.completed)
+
+    def lookup(self, index: int, text: str) -> Optional[str]:
+        """Retourne la traduction enregistrée d'un segment si son texte n'a pas changé."""
+        entry = self.completed.get(index)
+        if entry is None or entry[0] != self.segment_hash(text):
+            return None
+        return entry[1]
+
+    def __enter__(self) -> "TranslationCheckpoint":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.completed:
+            # Les lignes qui suivent la dernière entrée valide (écriture interrompue) sont supprimées
+            os.truncate(self.path, self._valid_size)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            # Nouveau travail (ou point de contrôle obsolète) : on repart d'un fichier vierge
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write({'job': self.job_id})
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._file.close()
+        self._file = None
+
+    def record(self, entries: list) -> None:
+        """
+        Enregistre des segments terminés et force leur écriture sur disque.
+
+        Args:
+            entries: Liste de tuples (index, texte source, traduction)
+        """
+        for index, text, translation in entries:
+            segment_hash = self.segment_hash(text)
+            if self.completed.get(index, (None,))[0] == segment_hash:
+                continue
+            self._write({'index': index, 'hash': segment_hash, 'translation': translation})
+            self.recorded += 1
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def remove(self) -> None:
+        """Supprime le point de contrôle une fois le travail terminé."""
+        if self.path.exists():
+            self.path.unlink()
+
+    def _write(self, payload: dict) -> None:
+        self._file.write(json.dumps(payload, ensure_ascii=False) + "\n")
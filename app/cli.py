@@ -1,24 +1,61 @@
 import argparse
+import contextlib
+import glob
+import itertools
+import os
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Dict, Iterable, Iterator, Optional, List
 
 from .logger import setup_logging, log_execution_time
-from .translator import NLLBTranslationService
-from .file_handlers import FileHandler
-from .utils import ProgressVisualizer, TextSegmenter
-import torch 
+from .translator import DECODING_PROFILES, NLLBTranslationService
+from .checkpoint import TranslationCheckpoint
+from .file_handlers import FileHandler, PdfPageReader, StreamingOutputWriter, StreamingTextReader
+from .server import RemoteTranslationService, TranslationServer
+from .telemetry import telemetry
+from .utils import Prefetcher, ProgressVisualizer, TextSegmenter
 
 class NLLBTranslationCLI:
     """Interface en ligne de commande pour le service de traduction NLLB"""
 
+    # Extensions traduites en mode répertoire / motif glob
+    MULTI_FILE_SUFFIXES = ('.txt', '.pdf')
+
     def __init__(self):
         self.logger = setup_logging()
-        self.translation_service = NLLBTranslationService()
         self.command_args = self._setup_command_line_interface()
+        if self.command_args.metrics_out or (self.command_args.serve and self.command_args.metrics):
+            telemetry.enable()
+        if self.command_args.workers > 1:
+            # Import différé : le pool importe torch
+            from .worker_pool import WorkerPoolTranslationService
+            self.translation_service = WorkerPoolTranslationService(
+                self.command_args.workers, self.command_args.threads_per_worker
+            )
+        else:
+            self.translation_service = NLLBTranslationService()
         self.execution_start_time = datetime.now()
+        self.run_statistics = {}
+
+        if self.command_args.no_translation_memory:
+            self.translation_service.use_translation_memory = False
+
+        if self.command_args.quantize:
+            self.translation_service.quantization = self.command_args.quantize
+
+        if self.command_args.profile:
+            self.translation_service.decoding_profile = self.command_args.profile
+
+        if self.command_args.compile:
+            self.translation_service.compile_model = True
+
+        if self.command_args.prune_vocabulary:
+            self.translation_service.vocabulary_pruning = True
+
+        if self.command_args.use_server and not self.command_args.serve:
+            self._connect_to_server()
 
     def _setup_command_line_interface(self) -> argparse.Namespace:
         """Configure les arguments de la ligne de commande"""
@@ -31,13 +68,13 @@ class NLLBTranslationCLI:
         argument_parser.add_argument(
             'input',
             nargs='?',
-            help="Texte à traduire ou chemin vers un fichier (.txt/.pdf)"
+            help="Texte à traduire, chemin vers un fichier (.txt/.pdf), un répertoire ou un motif glob"
         )
 
         # Options de langue
         argument_parser.add_argument(
             '-t', '--target-language',
-            help="Code de la langue cible (ex: fra_Latn)"
+            help="Code(s) de la langue cible, séparés par des virgules (ex: fra_Latn,spa_Latn)"
         )
         argument_parser.add_argument(
             '-s', '--source-language',
@@ -65,12 +102,127 @@ class NLLBTranslationCLI:
             default=500,
             help="Taille maximale des segments de texte à traduire"
         )
+        argument_parser.add_argument(
+            '--segmenter',
+            choices=['tokens', 'lines'],
+            default=os.getenv('SEGMENTER', 'tokens'),
+            help="Segmentation: phrases mesurées avec le tokenizer (tokens) ou groupes de 3 lignes (lines)"
+        )
         argument_parser.add_argument(
             '--batch-size',
             type=int,
-            default=8,
-            help="Nombre de segments à traduire simultanément (optimisation GPU)"
+            default=None,
+            help="Nombre maximal de segments à traduire simultanément (optimisation GPU)"
+        )
+        argument_parser.add_argument(
+            '--max-batch-tokens',
+            type=int,
+            default=None,
+            help="Budget de tokens par lot, padding compris (MAX_BATCH_TOKENS, 0 = lots de taille fixe)"
+        )
+        argument_parser.add_argument(
+            '--stream-window',
+            type=int,
+            default=int(os.getenv('STREAM_WINDOW', 512)),
+            help="Nombre de segments lus et traduits à la fois pour les fichiers (borne la mémoire)"
+        )
+        argument_parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Mode répertoire : retraduit les fichiers dont la sortie est déjà à jour"
+        )
+        argument_parser.add_argument(
+            '--checkpoint',
+            action='store_true',
+            help="Enregistre un point de contrôle à côté du fichier de sortie et reprend le travail interrompu"
+        )
+        argument_parser.add_argument(
+            '--quantize',
+            choices=['int8'],
+            default=None,
+            help="Quantification dynamique du modèle pour l'inférence CPU (QUANTIZATION)"
+        )
+        argument_parser.add_argument(
+            '--profile',
+            choices=list(DECODING_PROFILES),
+            default=os.getenv('DECODING_PROFILE') or None,
+            help="Profil de décodage: fast (glouton, sortie bornée), balanced (2 beams ou décodage assisté), "
+                 "quality (NUM_BEAMS beams)"
+        )
+        argument_parser.add_argument(
+            '--compile',
+            action='store_true',
+            help="Compile le modèle (torch.compile, cache KV statique) avec préchauffage au chargement (COMPILE_MODEL)"
+        )
+        argument_parser.add_argument(
+            '--prune-vocabulary',
+            action='store_true',
+            help="Restreint la projection de sortie au vocabulaire des langues cibles (VOCAB_PRUNING, "
+                 "vocabulaires construits par: uv run -m app.vocabulary)"
+        )
+        argument_parser.add_argument(
+            '--workers',
+            type=int,
+            default=int(os.getenv('WORKER_PROCESSES', 1)),
+            help="Processus de traduction CPU partageant les poids du modèle (1 = sans pool)"
+        )
+        argument_parser.add_argument(
+            '--threads-per-worker',
+            type=int,
+            default=int(os.getenv('THREADS_PER_WORKER', 0)),
+            help="Threads intra-op par worker (0 = cœurs / workers)"
         )
+        argument_parser.add_argument(
+            '--no-translation-memory',
+            action='store_true',
+            help="Désactive la mémoire de traduction persistante (cache des segments déjà traduits)"
+        )
+
+        # Mode serveur (modèle gardé en mémoire)
+        argument_parser.add_argument(
+            '--serve',
+            action='store_true',
+            help="Lance un serveur HTTP local qui garde le modèle chargé"
+        )
+        argument_parser.add_argument(
+            '--host',
+            default=os.getenv('SERVER_HOST', '127.0.0.1'),
+            help="Adresse d'écoute du serveur"
+        )
+        argument_parser.add_argument(
+            '--port',
+            type=int,
+            default=int(os.getenv('SERVER_PORT', 8765)),
+            help="Port d'écoute du serveur"
+        )
+        argument_parser.add_argument(
+            '--batch-window-ms',
+            type=float,
+            default=float(os.getenv('SERVER_BATCH_WINDOW_MS', 10)),
+            help="Fenêtre de regroupement des requêtes concurrentes (millisecondes)"
+        )
+        argument_parser.add_argument(
+            '--use-server',
+            action='store_true',
+            help="Transmet la traduction à un serveur déjà lancé (repli local s'il ne répond pas)"
+        )
+        argument_parser.add_argument(
+            '--server-url',
+            default=RemoteTranslationService.resolve_url(),
+            help="URL du serveur de traduction"
+        )
+
+        argument_parser.add_argument(
+            '--metrics-out',
+            default=os.getenv('METRICS_OUT'),
+            help="Écrit un rapport JSON des temps par étape, débits et pic mémoire"
+        )
+        argument_parser.add_argument(
+            '--metrics',
+            action='store_true',
+            help="Mode serveur : expose les mesures au format Prometheus sur /metrics"
+        )
+
         argument_parser.add_argument(
             '--debug-mode',
             action='store_true',
@@ -82,7 +234,14 @@ class NLLBTranslationCLI:
             help="Indique que l'entrée est un fichier"
         )
 
-        return argument_parser.parse_args()
+        args = argument_parser.parse_args()
+        if args.compile and args.workers > 1:
+            # Le forward compilé ne se transmet pas aux workers (démarrage par spawn)
+            argument_parser.error("--compile n'est pas compatible avec --workers > 1")
+        args.target_languages = list(dict.fromkeys(
+            code.strip() for code in (args.target_language or "").split(',') if code.strip()
+        ))
+        return args
 
     def run(self) -> None:
         """Point d'entrée principal (compatibilité avec main.py)"""
@@ -106,7 +265,20 @@ class NLLBTranslationCLI:
                 self._show_available_languages()
                 return
 
+            if self.command_args.serve:
+                self._run_server()
+                return
+
             self._validate_command_arguments()
+
+            if self.command_args.file and self._is_multi_file_input():
+                self._translate_many_files()
+                return
+
+            if self.command_args.file:
+                self._translate_file_streaming()
+                return
+
             input_content = self._load_input_content()
             translated_content = self._process_translation(input_content)
             self._save_or_display_result(translated_content)
@@ -121,25 +293,86 @@ class NLLBTranslationCLI:
             )
             sys.exit(1)
         finally:
+            close_service = getattr(self.translation_service, 'close', None)
+            if close_service:
+                close_service()
+            if self.command_args.metrics_out:
+                self._write_metrics_report()
             log_execution_time(
                 self.execution_start_time,
                 "Temps total d'exécution"
             )
 
+    def _write_metrics_report(self) -> None:
+        """Écrit le rapport de télémétrie de l'exécution (--metrics-out)"""
+        try:
+            telemetry.write_report(self.command_args.metrics_out, {
+                'run': {
+                    'input': self.command_args.input,
+                    'target_languages': self.command_args.target_languages,
+                    'source_language': self.command_args.source_language,
+                    'model': getattr(self.translation_service, 'model_name', None),
+                    'batch_statistics': self.run_statistics,
+                }
+            })
+            self.logger.info(f"Rapport de performance écrit dans: {self.command_args.metrics_out}")
+        except Exception as error:
+            self.logger.error(f"Impossible d'écrire le rapport de performance: {str(error)}")
+
+    def _connect_to_server(self) -> None:
+        """Remplace le service local par le client du serveur s'il répond"""
+        remote_service = RemoteTranslationService(
+            self.command_args.server_url,
+            self.translation_service.get_supported_languages()
+        )
+        if remote_service.is_available():
+            self.logger.info(f"Traduction transmise au serveur {self.command_args.server_url}")
+            self.translation_service = remote_service
+            # Ces options règlent le modèle local : le serveur garde les siennes
+            args = self.command_args
+            ignored = [
+                flag for flag, value in (
+                    ('--quantize', args.quantize),
+                    ('--profile', args.profile),
+                    ('--compile', args.compile),
+                    ('--prune-vocabulary', args.prune_vocabulary),
+                    ('--workers', args.workers > 1),
+                    ('--max-batch-tokens', args.max_batch_tokens is not None),
+                    ('--no-translation-memory', args.no_translation_memory),
+                ) if value
+            ]
+            if ignored:
+                self.logger.warning(
+                    f"Options sans effet avec le serveur (réglages du modèle local): {', '.join(ignored)}"
+                )
+        else:
+            self.logger.warning(
+                f"Aucun serveur sur {self.command_args.server_url}, traduction locale"
+            )
+
+    def _run_server(self) -> None:
+        """Lance le serveur de traduction (bloquant)"""
+        server = TranslationServer(
+            self.translation_service,
+            host=self.command_args.host,
+            port=self.command_args.port,
+            batch_window_ms=self.command_args.batch_window_ms
+        )
+        server.run()
+
     def _validate_command_arguments(self):
         """Valide les arguments fournis en ligne de commande"""
         if not self.command_args.input:
             raise ValueError("Aucune entrée spécifiée (texte ou fichier)")
 
-        if not self.command_args.source_language:
-            raise ValueError("Langue source non spécifiée (option -s/--source-language requise)")
-
-        if not self.command_args.target_language:
+        if not self.command_args.target_languages:
             raise ValueError("Langue cible non spécifiée (option -t/--target-language requise)")
 
-        # Validation des codes de langue
-        for lang_type in ['source', 'target']:
-            lang = getattr(self.command_args, f"{lang_type}_language")
+        # Validation des codes de langue (langue source détectée par segment si omise)
+        languages = [('target', lang) for lang in self.command_args.target_languages]
+        if self.command_args.source_language:
+            languages.append(('source', self.command_args.source_language))
+        for lang_type, lang in languages:
             if not self.translation_service.is_language_supported(lang):
                 raise ValueError(f"Langue {lang_type} non supportée: {lang}")
 
@@ -154,31 +387,48 @@ class NLLBTranslationCLI:
         for language_code, language_name in languages.items():
             print(f"  {language_code:12} → {language_name}")
 
+    def _resolve_input_path(self) -> Path:
+        """Vérifie et retourne le chemin du fichier d'entrée"""
+        input_path = Path(self.command_args.input)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Fichier introuvable: {input_path}")
+        if input_path.is_dir():
+            raise IsADirectoryError(f"Le chemin spécifié est un répertoire : {input_path}")
+        return input_path
+
     def _load_input_content(self) -> str:
         """Charge le contenu à traduire depuis un fichier ou une chaîne directe"""
         if self.command_args.file:
-            input_path = Path(self.command_args.input)
-            if not input_path.exists():
-                raise FileNotFoundError(f"Fichier introuvable: {input_path}")
-            if input_path.is_dir():
-                raise IsADirectoryError(f"Le chemin spécifié est un répertoire : {input_path}")
-            return FileHandler.read_file(input_path, self.command_args.encoding)
+            return FileHandler.read_file(self._resolve_input_path(), self.command_args.encoding)
         else:
             return self.command_args.input
 
-    def _process_translation(self, content: str) -> str:
-        """Gère le processus de traduction avec gestion des erreurs"""
+    def _process_translation(self, content: str) -> Dict[str, str]:
+        """Gère le processus de traduction avec gestion des erreurs
+
+        Returns:
+            Texte traduit pour chaque langue cible
+        """
         if not content.strip():
             raise ValueError("Le contenu à traduire est vide")
 
+        target_languages = self.command_args.target_languages
+
         # Traduction directe pour les petits textes
         if len(content) <= self.command_args.chunk_size:
             try:
-                return self.translation_service.translate_text(
-                    content,
-                    self.command_args.target_language,
+                if len(target_languages) == 1:
+                    return {target_languages[0]: self.translation_service.translate_text(
+                        content,
+                        target_languages[0],
+                        self.command_args.source_language
+                    )}
+                translations = self.translation_service.translate_batch_multi(
+                    [content],
+                    target_languages,
                     self.command_args.source_language
                 )
+                return {target: texts[0] for target, texts in translations.items()}
             except Exception as error:
                 self.logger.error(f"Échec de la traduction: {str(error)}")
                 raise
@@ -193,87 +443,416 @@ class NLLBTranslationCLI:
             self.logger.error(f"Échec de la traduction segmentée: {str(error)}")
             raise
 
-    def _translate_large_content(self, content: str) -> str:
+    def _translate_large_content(self, content: str) -> Dict[str, str]:
         """Traduit un contenu volumineux en gérant les erreurs de marqueurs et la mémoire
         
         Args:
             content: Texte source à traduire
             
         Returns:
-            Texte traduit avec structure préservée
+            Texte traduit avec structure préservée, pour chaque langue cible
         """
-        paragraphs = TextSegmenter.split_paragraphs(content)
-        translated_segments = []
+        paragraphs = list(self._segment(content.split('\n')))
         start_time = time.time()
         total_paragraphs = len(paragraphs)
-        
-        self.logger.debug(f"Début traduction de {total_paragraphs} paragraphes")
+        skipped = sum(1 for paragraph in paragraphs if not paragraph.strip())
 
-        for idx, paragraph in enumerate(paragraphs, 1):
-            try:
-                # Gestion des paragraphes vides
-                if not paragraph.strip():
-                    translated_segments.append("")
-                    ProgressVisualizer.display_progress(idx, total_paragraphs, start_time)
-                    continue
-               
-                # Traduction avec suivi de mémoire
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-        
-            
-                translated = self.translation_service.translate_text(
-                    paragraph,
-                    self.command_args.target_language,
-                    self.command_args.source_language
-                )
-                
+        self.logger.debug(
+            f"Début traduction de {total_paragraphs} paragraphes ({total_paragraphs - skipped} à traduire)"
+        )
+
+        def report_progress(done: int) -> None:
+            ProgressVisualizer.display_progress(skipped + done, total_paragraphs, start_time)
+
+        translated_segments = self._translate_paragraphs(paragraphs, progress_callback=report_progress)
+        self._log_batch_statistics()
+
+        self.logger.info(f"Traduction terminée - {total_paragraphs} paragraphes traités")
+        return {target: "\n".join(segments) for target, segments in translated_segments.items()}
+
+    def _translate_file_streaming(self) -> None:
+        """Traduit un fichier en flux : lecture, segmentation, traduction et écriture incrémentales
+
+        La mémoire utilisée dépend de la taille de fenêtre (--stream-window), pas du document.
+        Le source n'est lu et segmenté qu'une fois, avec un fichier de sortie par langue cible.
+        """
+        input_path = self._resolve_input_path()
+        output_paths = {target: self._determine_output_path(target) for target in self.command_args.target_languages}
+        if input_path.suffix.lower() == '.pdf':
+            # Extraction parallèle : les premières pages se traduisent pendant l'extraction des suivantes
+            reader = PdfPageReader(input_path)
+        else:
+            reader = StreamingTextReader(input_path)
+        if not reader.progress()[1]:
+            raise ValueError("Le contenu à traduire est vide")
+
+        paragraphs = self._segment(reader)
+        window_size = max(1, self.command_args.stream_window)
+        start_time = time.time()
+        total_paragraphs = 0
+        translated_paragraphs = 0
+
+        self.logger.info(f"Début de la traduction en flux ({reader.format_name}, fenêtres de {window_size} segments)...")
+
+        checkpoints = None
+        if self.command_args.checkpoint:
+            checkpoints = {}
+            for target, output_path in output_paths.items():
+                checkpoint = TranslationCheckpoint(output_path, self._job_parameters(input_path, target))
+                available = checkpoint.load()
+                if available:
+                    self.logger.info(f"Point de contrôle trouvé: {available} segments déjà traduits ({checkpoint.path})")
+                checkpoints[target] = checkpoint
+
+        try:
+            with contextlib.ExitStack() as stack:
+                writers = {
+                    target: stack.enter_context(StreamingOutputWriter(output_path, self.command_args.encoding))
+                    for target, output_path in output_paths.items()
+                }
+                for checkpoint in (checkpoints or {}).values():
+                    stack.enter_context(checkpoint)
+
+                # Lecture et segmentation de la fenêtre suivante pendant la traduction de la courante
+                windows = Prefetcher(iter(lambda: list(itertools.islice(paragraphs, window_size)), []))
+                for window in windows:
+                    translations = self._translate_paragraphs(window, offset=total_paragraphs, checkpoints=checkpoints)
+                    for target, writer in writers.items():
+                        writer.write_segments(translations[target])
+                    total_paragraphs += len(window)
+                    translated_paragraphs += sum(1 for paragraph in window if paragraph.strip())
+                    ProgressVisualizer.display_progress(*reader.progress(), start_time)
+        except OSError as error:
+            # Seules les erreurs de lecture/écriture sont reformulées : celles du modèle remontent telles quelles
+            raise IOError(f"Erreur lors de la traduction en flux: {str(error)}") from error
+
+        if not translated_paragraphs:
+            raise ValueError("Le contenu à traduire est vide")
+
+        if checkpoints:
+            resumed = self.run_statistics.get('resumed', 0)
+            self.logger.info(
+                f"Reprise: {resumed} segments repris du point de contrôle, "
+                f"{translated_paragraphs - resumed} traduits pendant cette exécution"
+            )
+            for checkpoint in checkpoints.values():
+                checkpoint.remove()
+
+        self._log_batch_statistics()
+        self.logger.info(f"Traduction terminée - {total_paragraphs} paragraphes traités")
+        for output_path in output_paths.values():
+            self.logger.info(f"Résultat sauvegardé dans: {output_path}")
+
+    def _is_multi_file_input(self) -> bool:
+        """Indique si l'entrée désigne un répertoire ou un motif glob"""
+        return Path(self.command_args.input).is_dir() or glob.has_magic(self.command_args.input)
+
+    def _collect_input_files(self) -> List[Path]:
+        """Liste récursivement les fichiers texte d'un répertoire ou d'un motif glob
+
+        Les fichiers produits par L2T (*_translated.txt) sont exclus.
+        """
+        input_path = Path(self.command_args.input)
+        if input_path.is_dir():
+            candidates = input_path.rglob('*')
+        else:
+            candidates = (Path(match) for match in glob.iglob(self.command_args.input, recursive=True))
+
+        return sorted(
+            path for path in candidates
+            if path.is_file()
+            and path.suffix.lower() in self.MULTI_FILE_SUFFIXES
+            and not path.stem.endswith('_translated')
+        )
+
+    def _translate_many_files(self) -> None:
+        """Traduit un ensemble de fichiers avec un seul modèle chargé
+
+        Les segments de plusieurs fichiers sont regroupés dans des fenêtres communes
+        (--stream-window) pour que les petits fichiers remplissent les lots. Chaque
+        fichier est écrit dès que tous ses segments sont traduits.
+        """
+        if self.command_args.output_file:
+            raise ValueError("L'option -o/--output-file n'est pas compatible avec un répertoire ou un motif")
+
+        input_files = self._collect_input_files()
+        if not input_files:
+            raise FileNotFoundError(f"Aucun fichier à traduire pour: {self.command_args.input}")
+
+        # Le nom de sortie ne garde que le nom sans extension : doc.txt et doc.pdf écriraient le même fichier
+        sources = {}
+        for input_path in input_files:
+            output_path = self._output_path_for(input_path, self.command_args.target_languages[0])
+            sources.setdefault(output_path, []).append(input_path)
+        collisions = [paths for paths in sources.values() if len(paths) > 1]
+        if collisions:
+            raise ValueError(
+                "Fichiers d'entrée produisant le même fichier de sortie (préciser un motif, ex: *.txt): "
+                + "; ".join(", ".join(str(path) for path in paths) for paths in collisions)
+            )
+
+        window_size = max(1, self.command_args.stream_window)
+        start_time = time.time()
+        pool = []
+        skipped = 0
+        totals = {'files': 0, 'segments': 0, 'characters': 0}
+
+        def flush_pool(files_consumed: int) -> None:
+            translations = self._translate_paragraphs([job['paragraphs'][idx] for job, idx in pool])
+            for position, (job, idx) in enumerate(pool):
+                for target in job['outputs']:
+                    job['translations'][target][idx] = translations[target][position]
+                job['remaining'] -= 1
+                if not job['remaining']:
+                    self._write_file_job(job, totals)
+            pool.clear()
+            ProgressVisualizer.display_progress(files_consumed, len(input_files), start_time)
+
+        for files_consumed, input_path in enumerate(input_files, 1):
+            output_paths = {
+                target: self._output_path_for(input_path, target)
+                for target in self.command_args.target_languages
+            }
+            if not self.command_args.force and all(
+                output_path.exists() and output_path.stat().st_mtime >= input_path.stat().st_mtime
+                for output_path in output_paths.values()
+            ):
+                skipped += 1
+                continue
+
+            content = FileHandler.read_file(input_path, self.command_args.encoding)
+            if content is None or not content.strip():
+                self.logger.warning(f"Fichier ignoré (illisible ou vide): {input_path}")
+                continue
+
+            paragraphs = list(self._segment(content.split('\n')))
+            job = {
+                'input': input_path,
+                'outputs': output_paths,
+                'paragraphs': paragraphs,
+                'translations': {target: [""] * len(paragraphs) for target in output_paths},
+                'remaining': len(paragraphs),
+                'characters': len(content),
+            }
+            pool.extend((job, idx) for idx in range(len(paragraphs)))
+
+            if len(pool) >= window_size:
+                flush_pool(files_consumed)
+
+        if pool:
+            flush_pool(len(input_files))
+
+        elapsed = max(time.time() - start_time, 1e-9)
+        self._log_batch_statistics()
+        self.logger.info(
+            f"{totals['files']} fichiers traduits, {skipped} déjà à jour - "
+            f"{totals['segments']} segments, {totals['characters']} caractères en {elapsed:.1f}s "
+            f"({totals['files'] / elapsed:.2f} fichiers/s, {totals['segments'] / elapsed:.1f} segments/s)"
+        )
+
+    def _write_file_job(self, job: dict, totals: dict) -> None:
+        """Écrit les traductions complètes d'un fichier du mode répertoire"""
+        try:
+            for target, output_path in job['outputs'].items():
+                with StreamingOutputWriter(output_path, self.command_args.encoding) as writer:
+                    writer.write_segments(job['translations'][target])
+                self.logger.debug(f"Résultat sauvegardé dans: {output_path}")
+        except Exception as error:
+            self.logger.error(f"Erreur lors de la sauvegarde de {job['input']}: {str(error)}")
+            return
+
+        totals['files'] += 1
+        totals['segments'] += sum(1 for paragraph in job['paragraphs'] if paragraph.strip())
+        totals['characters'] += job['characters']
+        # Libère le contenu du fichier terminé
+        job['paragraphs'] = job['translations'] = None
+
+    def _translate_paragraphs(
+        self,
+        paragraphs: List[str],
+        offset: int = 0,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        checkpoints: Optional[Dict[str, TranslationCheckpoint]] = None
+    ) -> Dict[str, List[str]]:
+        """Traduit une liste de paragraphes par lots en conservant les paragraphes vides à leur place
+
+        Args:
+            paragraphs: Paragraphes issus de TextSegmenter
+            offset: Position du premier paragraphe dans le document
+            progress_callback: Reçoit le nombre de paragraphes non vides traduits
+            checkpoints: Points de contrôle par langue cible à consulter puis compléter (optionnel)
+
+        Returns:
+            Paragraphes traduits dans l'ordre d'origine, pour chaque langue cible
+        """
+        target_languages = self.command_args.target_languages
+        # Les paragraphes vides (sauts de ligne ou de page) sont recopiés tels quels
+        translated_segments = {
+            target: [paragraph if not paragraph.strip() else "" for paragraph in paragraphs]
+            for target in target_languages
+        }
+
+        # Seuls les paragraphes non vides partent au modèle, les sauts de ligne restent en place
+        pending = []
+        for idx, paragraph in enumerate(paragraphs):
+            if not paragraph.strip():
+                continue
+            resumed = {
+                target: checkpoint.lookup(offset + idx, paragraph)
+                for target, checkpoint in (checkpoints or {}).items()
+            }
+            if checkpoints and None not in resumed.values():
+                for target, translated in resumed.items():
+                    translated_segments[target][idx] = translated
+                self.run_statistics['resumed'] = self.run_statistics.get('resumed', 0) + 1
+            else:
+                pending.append((idx, paragraph))
+        if not pending:
+            return translated_segments
+
+        failed = set()
+
+        def handle_segment_error(position: int, error: Exception) -> str:
+            idx, paragraph = pending[position]
+            failed.add(idx)
+            self.logger.error(f"Erreur paragraphe {offset + idx + 1}: {str(error)}")
+            return f"[ERROR: {paragraph[:50]}...]"
+
+        translations = self.translation_service.translate_batch_multi(
+            [paragraph for _, paragraph in pending],
+            target_languages,
+            self.command_args.source_language,
+            batch_size=self.command_args.batch_size,
+            max_batch_tokens=self.command_args.max_batch_tokens,
+            on_error=handle_segment_error,
+            progress_callback=progress_callback
+        )
+        self._collect_batch_statistics()
+
+        for target in target_languages:
+            for (idx, _), translated in zip(pending, translations[target]):
                 # Validation et correction du résultat
                 final_text = translated.replace("[CONTECT", "[CONTEXT")
                 if final_text != translated:
-                    self.logger.debug(f"Corrigé marqueur dans le paragraphe {idx}")
-                    
-                translated_segments.append(final_text)
-                
-            except Exception as e:
-                self.logger.error(f"Erreur paragraphe {idx}: {str(e)}")
-                translated_segments.append(f"[ERROR: {paragraph[:50]}...]")
-                
-            ProgressVisualizer.display_progress(idx, total_paragraphs, start_time)
+                    self.logger.debug(f"Corrigé marqueur dans le paragraphe {offset + idx + 1}")
+                translated_segments[target][idx] = final_text
+
+        for target, checkpoint in (checkpoints or {}).items():
+            # Les segments en erreur ne sont pas enregistrés : ils seront retentés à la reprise
+            checkpoint.record([
+                (offset + idx, paragraph, translated_segments[target][idx])
+                for idx, paragraph in pending if idx not in failed
+            ])
+
+        return translated_segments
+
+    def _segment(self, lines: Iterable[str]) -> Iterator[str]:
+        """Segmente un flux de lignes selon --segmenter (lignes vides et sauts de page conservés)"""
+        get_segmenter = getattr(self.translation_service, 'get_segmenter', None)
+        if self.command_args.segmenter == 'tokens' and get_segmenter:
+            return get_segmenter().iter_segments(lines)
+        # Client serveur (pas de tokenizer local) ou mode historique
+        return TextSegmenter.iter_paragraphs(lines)
+
+    def _job_parameters(self, input_path: Path, target_language: str) -> dict:
+        """Paramètres qui identifient un travail de traduction pour sa reprise"""
+        return {
+            'input': str(input_path.resolve()),
+            'model': getattr(self.translation_service, 'model_name', None),
+            'source_language': self.command_args.source_language,
+            'target_language': target_language,
+            # Une autre segmentation change l'indexation des segments
+            'segmenter': self.command_args.segmenter,
+            'segment_target_tokens': os.getenv('SEGMENT_TARGET_TOKENS', '200'),
+        }
+
+    def _collect_batch_statistics(self) -> None:
+        """Cumule les statistiques de lots et de mémoire de traduction du dernier appel"""
+        for statistics in (self.translation_service.cache_statistics, self.translation_service.batch_statistics):
+            for name, value in statistics.items():
+                if name != 'padding_ratio':
+                    self.run_statistics[name] = self.run_statistics.get(name, 0) + value
+
+    def _log_batch_statistics(self) -> None:
+        """Journalise le remplissage des lots et l'usage de la mémoire de traduction"""
+        statistics = self.run_statistics
+        if 'hits' in statistics:
+            self.logger.info(
+                f"Mémoire de traduction: {statistics['hits']} segments retrouvés, "
+                f"{statistics['misses']} à traduire ({statistics.get('duplicates', 0)} doublons)"
+            )
 
-        self.logger.info(f"Traduction terminée - {total_paragraphs} paragraphes traités")
-        return "\n".join(translated_segments)
-    
-    def _save_or_display_result(self, translated_text: str) -> None:
-        """Gère la sortie du résultat (fichier ou affichage console)"""
-        output_path = self._determine_output_path()
+        if statistics.get('padded_tokens'):
+            padding_ratio = 1 - statistics['real_tokens'] / statistics['padded_tokens']
+            self.logger.info(
+                f"Lots: {statistics['batches']} pour {statistics['segments']} segments - "
+                f"tokens utiles {statistics['real_tokens']}/{statistics['padded_tokens']} "
+                f"(padding {padding_ratio:.1%})"
+            )
+        elif statistics.get('batches'):
+            self.logger.info(f"Lots: {statistics['batches']} pour {statistics['segments']} segments")
 
-        if output_path:
-            try:
-                FileHandler.write_output(
-                    translated_text,
-                    output_path,
-                    self.command_args.encoding
-                )
-                self.logger.info(f"Résultat sauvegardé dans: {output_path}")
-            except Exception as error:
-                raise IOError(f"Erreur lors de la sauvegarde: {str(error)}")
-        else:
-            # Affichage d'un aperçu si pas de fichier de sortie spécifié
-            preview = (translated_text[:500] + "...") if len(translated_text) > 500 else translated_text
-        #    print("\n=== RESULTAT DE LA TRADUCTION ===")
-            print('[l2t]:<',preview,'>')
-        #    print("===============================")
+        if statistics.get('oom_retries'):
+            budgets = ", ".join(
+                f"{budget.current}/{budget.limit} {unit}"
+                for (unit, _), budget in getattr(self.translation_service, 'batch_budgets', {}).items()
+            )
+            self.logger.warning(
+                f"Saturations mémoire: {statistics['oom_retries']} lots redécoupés - budget retenu {budgets}"
+            )
 
-    def _determine_output_path(self) -> Optional[Path]:
+        if statistics.get('length_capped'):
+            self.logger.warning(
+                f"Traductions arrêtées par la borne de longueur (hallucinations probables): "
+                f"{statistics['length_capped']}"
+            )
+
+        if statistics.get('vocabulary_fallbacks'):
+            self.logger.info(f"Traductions régénérées avec le vocabulaire complet: {statistics['vocabulary_fallbacks']}")
+
+    def _save_or_display_result(self, translations: Dict[str, str]) -> None:
+        """Gère la sortie du résultat (fichier ou affichage console) pour chaque langue cible"""
+        for target, translated_text in translations.items():
+            output_path = self._determine_output_path(target)
+
+            if output_path:
+                try:
+                    FileHandler.write_output(
+                        translated_text,
+                        output_path,
+                        self.command_args.encoding
+                    )
+                    self.logger.info(f"Résultat sauvegardé dans: {output_path}")
+                except Exception as error:
+                    raise IOError(f"Erreur lors de la sauvegarde: {str(error)}")
+            else:
+                # Affichage d'un aperçu si pas de fichier de sortie spécifié
+                preview = (translated_text[:500] + "...") if len(translated_text) > 500 else translated_text
+                label = 'l2t' if len(translations) == 1 else f"l2t:{target}"
+            #    print("\n=== RESULTAT DE LA TRADUCTION ===")
+                print(f'[{label}]:<', preview, '>')
+            #    print("===============================")
+
+    def _determine_output_path(self, target_language: Optional[str] = None) -> Optional[Path]:
         """Détermine le chemin de sortie automatiquement si besoin"""
+        target_language = target_language or self.command_args.target_languages[0]
+
         if self.command_args.output_file:
-            return Path(self.command_args.output_file)
+            output_path = Path(self.command_args.output_file)
+            if len(self.command_args.target_languages) > 1:
+                # Un fichier par langue : sortie.txt -> sortie_fra-Latn.txt
+                lang_code = target_language.replace('_', '-')
+                return output_path.with_name(f"{output_path.stem}_{lang_code}{output_path.suffix}")
+            return output_path
 
         if self.command_args.file:
             input_path = Path(self.command_args.input)
             if input_path.is_file():
-                lang_code = self.command_args.target_language.replace('_', '-')
-                return input_path.parent / f"{input_path.stem}_{lang_code}_translated.txt"
+                return self._output_path_for(input_path, target_language)
+
+        return None
 
-        return None
\ No newline at end of file
+    def _output_path_for(self, input_path: Path, target_language: str) -> Path:
+        """Nom de sortie automatique d'un fichier source"""
+        lang_code = target_language.replace('_', '-')
+        return input_path.parent / f"{input_path.stem}_{lang_code}_translated.txt"
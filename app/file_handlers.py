@@ -1,12 +1,30 @@
-import PyPDF2
+import codecs
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterable, Iterator, Optional, Union
 import logging
 import os
 from dotenv import load_dotenv
 
+from .telemetry import telemetry
+
 load_dotenv()  # Load environment variables from .env file
 
+# Séparateur de pages conservé dans les documents traduits (ligne isolée)
+PAGE_BREAK = "\f"
+
+
+def _extract_pdf_page_range(pdf_path: str, start: int, stop: int) -> list[str]:
+    """Extrait le texte des pages [start, stop) d'un PDF (exécuté dans un processus de travail)."""
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [reader.pages[idx].extract_text() or "" for idx in range(start, stop)]
+
+
 class FileHandler:
     """Gestionnaire de fichiers pour la lecture/écriture de différents formats."""
 
@@ -14,28 +32,26 @@ class FileHandler:
     def read_file(file_path: Union[str, Path], encoding: str = 'utf-8') -> Optional[str]:
         """Lecture avec gestion robuste des encodages"""
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-                for enc in ['utf-8', 'iso-8859-1', 'cp1252']:  # Essai des encodages courants
-                    try:
-                        return raw_data.decode(enc)
-                    except UnicodeDecodeError:
-                        continue
-                raise ValueError(f"Encodage non reconnu pour {file_path}")
+            with telemetry.stage('read'):
+                if Path(file_path).suffix.lower() == '.pdf':
+                    return FileHandler._read_pdf(Path(file_path))
+                with open(file_path, 'rb') as f:
+                    raw_data = f.read()
+                    for enc in ['utf-8', 'iso-8859-1', 'cp1252']:  # Essai des encodages courants
+                        try:
+                            return raw_data.decode(enc)
+                        except UnicodeDecodeError:
+                            continue
+                    raise ValueError(f"Encodage non reconnu pour {file_path}")
         except Exception as e:
             logging.error(f"Erreur lors de la lecture du fichier {file_path}: {str(e)}")
             return None
 
     @staticmethod
     def _read_pdf(pdf_path: Path) -> str:
-        """Extrait le texte d'un fichier PDF."""
-        text = []
+        """Extrait le texte d'un fichier PDF (pages séparées par PAGE_BREAK)."""
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text.append(page.extract_text() or "")
-            return '\n'.join(text)
+            return f'\n{PAGE_BREAK}\n'.join(PdfPageReader(pdf_path).iter_pages())
         except Exception as e:
             raise IOError(f"Erreur PDF: {str(e)}")
 
@@ -55,14 +71,188 @@ class FileHandler:
     def write_output(content: str, output_path: Path, encoding: str = 'utf-8') -> None:
         """Écriture sécurisée avec vérification d'intégrité"""
         try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding=encoding) as f:
-                # Vérification proactive des marqueurs
-            #    content = content.replace("CONTECT", "CONTEXT")
-                f.write(content)
-            # Validation a posteriori
-            with open(output_path, 'r', encoding=encoding) as f:
-                if "CONTECT" in f.read():
-                    raise IOError("Échec de correction des marqueurs")
+            with StreamingOutputWriter(output_path, encoding) as writer:
+                writer.write_segments([content])
         except Exception as e:
-            raise IOError(f"Erreur d'écriture validée : {str(e)}")
\ No newline at end of file
+            raise IOError(f"Erreur d'écriture validée : {str(e)}")
+
+
+class StreamingTextReader:
+    """
+    Lecture ligne à ligne d'un fichier texte avec décodage incrémental.
+
+    Les lignes sont produites sans leur saut de ligne, comme `text.split('\\n')`,
+    sans jamais charger le fichier entier en mémoire.
+    """
+
+    ENCODINGS = ('utf-8', 'iso-8859-1', 'cp1252')
+
+    def __init__(self, file_path: Union[str, Path], sample_size: int = 65536):
+        self.file_path = Path(file_path)
+        self.total_bytes = self.file_path.stat().st_size
+        self.bytes_read = 0
+        self.encoding = self._detect_encoding(sample_size)
+        self.format_name = self.encoding
+
+    def progress(self) -> tuple:
+        """Avancement (octets lus, taille du fichier)."""
+        return self.bytes_read, self.total_bytes
+
+    def _detect_encoding(self, sample_size: int) -> str:
+        """Choisit le premier encodage qui décode l'échantillon initial du fichier."""
+        with open(self.file_path, 'rb') as f:
+            sample = f.read(sample_size)
+        for enc in self.ENCODINGS:
+            try:
+                # Décodage non final : un caractère coupé en fin d'échantillon est toléré
+                codecs.getincrementaldecoder(enc)().decode(sample, final=False)
+                return enc
+            except UnicodeDecodeError:
+                continue
+        raise ValueError(f"Encodage non reconnu pour {self.file_path}")
+
+    def __iter__(self) -> Iterator[str]:
+        return telemetry.timed_iter('read', self._iter_lines())
+
+    def _iter_lines(self) -> Iterator[str]:
+        """
+        Décode le fichier ligne à ligne, sans remplacement silencieux.
+
+        L'encodage est choisi sur l'échantillon initial : si une ligne plus loin ne se
+        décode pas, la suite du fichier (ligne fautive comprise) est lue avec le premier
+        encodage de repli qui la décode, avec un avertissement indiquant la position.
+        Les lignes déjà produites étaient valides et restent inchangées.
+        """
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        # Seule la dernière ligne du fichier peut ne pas se terminer par un saut de ligne
+        last_line = ""
+        with open(self.file_path, 'rb') as f:
+            for raw_line in f:
+                offset = self.bytes_read
+                self.bytes_read += len(raw_line)
+                try:
+                    line = decoder.decode(raw_line)
+                except UnicodeDecodeError as error:
+                    decoder, line = self._switch_encoding(raw_line, offset + error.start)
+                if line.endswith('\n'):
+                    yield line[:-1]
+                else:
+                    last_line = line
+            # Caractère multi-octets incomplet en fin de fichier
+            pending = decoder.getstate()[0]
+            try:
+                last_line += decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                last_line += self._switch_encoding(pending, self.bytes_read - len(pending))[1]
+        yield last_line
+
+    def _switch_encoding(self, raw_line: bytes, position: int) -> tuple:
+        """Passe à l'encodage de repli suivant qui décode la ligne (retourne décodeur et ligne)."""
+        for enc in self.ENCODINGS[self.ENCODINGS.index(self.encoding) + 1:]:
+            decoder = codecs.getincrementaldecoder(enc)()
+            try:
+                line = decoder.decode(raw_line)
+            except UnicodeDecodeError:
+                continue
+            logging.warning(
+                f"Octets invalides en {self.encoding} à la position {position} de {self.file_path}: "
+                f"suite du fichier lue en {enc}"
+            )
+            self.encoding = enc
+            self.format_name = enc
+            return decoder, line
+        raise ValueError(f"Encodage non reconnu à l'octet {position} de {self.file_path}")
+
+
+class PdfPageReader:
+    """
+    Extraction parallèle du texte d'un PDF, produite page à page dans l'ordre.
+
+    Les pages sont réparties par blocs sur un pool de processus ; le nombre de blocs
+    en cours est borné pour que l'extraction avance pendant la traduction des pages
+    déjà produites sans accumuler tout le document en mémoire.
+    """
+
+    format_name = 'pdf'
+
+    def __init__(self, pdf_path: Union[str, Path], workers: Optional[int] = None, pages_per_task: Optional[int] = None):
+        self.pdf_path = Path(pdf_path)
+        self.workers = workers or int(os.getenv('PDF_WORKERS', 0)) or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task or int(os.getenv('PDF_PAGES_PER_TASK', 4)))
+        import PyPDF2
+        with open(self.pdf_path, 'rb') as file:
+            self.total_pages = len(PyPDF2.PdfReader(file).pages)
+        self.pages_read = 0
+
+    def progress(self) -> tuple:
+        """Avancement (pages lues, pages totales)."""
+        return self.pages_read, self.total_pages
+
+    def iter_pages(self) -> Iterator[str]:
+        """Produit le texte de chaque page, dans l'ordre du document."""
+        ranges = [
+            (start, min(start + self.pages_per_task, self.total_pages))
+            for start in range(0, self.total_pages, self.pages_per_task)
+        ]
+
+        # Petit document : pas de pool de processus
+        if self.workers == 1 or len(ranges) <= 1:
+            for start, stop in ranges:
+                for page in _extract_pdf_page_range(str(self.pdf_path), start, stop):
+                    self.pages_read += 1
+                    yield page
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            remaining = iter(ranges)
+            for start, stop in itertools.islice(remaining, self.workers * 2):
+                pending.append(executor.submit(_extract_pdf_page_range, str(self.pdf_path), start, stop))
+
+            while pending:
+                pages = pending.popleft().result()
+                next_range = next(remaining, None)
+                if next_range:
+                    pending.append(executor.submit(_extract_pdf_page_range, str(self.pdf_path), *next_range))
+                for page in pages:
+                    self.pages_read += 1
+                    yield page
+
+    def __iter__(self) -> Iterator[str]:
+        """Produit les lignes du document, avec une ligne PAGE_BREAK entre deux pages."""
+        return telemetry.timed_iter('read', self._iter_lines())
+
+    def _iter_lines(self) -> Iterator[str]:
+        for page_number, page in enumerate(self.iter_pages()):
+            if page_number:
+                yield PAGE_BREAK
+            yield from page.split('\n')
+
+
+class StreamingOutputWriter:
+    """Écriture incrémentale d'un document traduit, segments séparés par des sauts de ligne."""
+
+    def __init__(self, output_path: Path, encoding: str = 'utf-8'):
+        self.output_path = Path(output_path)
+        self.encoding = encoding
+        self.segments_written = 0
+        self._file = None
+
+    def __enter__(self) -> "StreamingOutputWriter":
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.output_path, 'w', encoding=self.encoding)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._file.close()
+
+    def write_segments(self, segments: Iterable[str]) -> None:
+        """Ajoute des segments au fichier en validant les marqueurs au fil de l'eau."""
+        with telemetry.stage('write'):
+            for segment in segments:
+                if "CONTECT" in segment:
+                    raise IOError("Échec de correction des marqueurs")
+                if self.segments_written:
+                    self._file.write("\n")
+                self._file.write(segment)
+                self.segments_written += 1
\ No newline at end of file
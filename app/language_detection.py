@@ -0,0 +1,112 @@
+import logging
+import os
+from collections import Counter
+from typing import Iterable, Optional
+
+from .telemetry import telemetry
+
+
+class LanguageDetector:
+    """
+    Identification de la langue source de chaque segment (modèle fastText LID de NLLB).
+
+    Le modèle facebook/fasttext-language-identification prédit directement les codes
+    NLLB (fra_Latn, eng_Latn...) : seuls ceux de supported_languages.json sont retenus.
+    Une liste de segments est classée en un seul appel au modèle (quelques dizaines de
+    microsecondes par segment sur CPU). Les segments trop courts ou incertains reçoivent
+    la langue majoritaire des segments fiables du même appel ; à défaut, la langue
+    majoritaire du document (appels précédents, fenêtres d'un fichier lu en flux).
+    """
+
+    LABEL_PREFIX = '__label__'
+    DEFAULT_MODEL = 'facebook/fasttext-language-identification'
+
+    def __init__(self, supported_languages: Iterable[str], model_path: Optional[str] = None,
+                 min_confidence: Optional[float] = None, min_chars: Optional[int] = None, candidates: int = 3):
+        self.supported_languages = set(supported_languages)
+        self.model_path = model_path or os.getenv('LANGID_MODEL', '').strip() or self.DEFAULT_MODEL
+        self.min_confidence = (
+            float(os.getenv('LANGID_MIN_CONFIDENCE', 0.5)) if min_confidence is None else min_confidence
+        )
+        self.min_chars = int(os.getenv('LANGID_MIN_CHARS', 20)) if min_chars is None else min_chars
+        self.candidates = candidates
+        self.model = None
+        # Segments fiables par langue sur tous les appels (repli des segments sans langue reconnue)
+        self.document_languages = Counter()
+        self.logger = logging.getLogger('T2L')
+
+    @property
+    def document_language(self) -> Optional[str]:
+        """Langue majoritaire des segments fiables de tous les appels (None avant le premier)."""
+        return self.document_languages.most_common(1)[0][0] if self.document_languages else None
+
+    def load(self):
+        """
+        Charge le modèle fastText (fichier local ou dépôt Hugging Face, mis en cache dans CACHE_DIR).
+
+        Raises:
+            RuntimeError: Si fasttext n'est pas installé ou si le modèle est introuvable
+        """
+        if self.model is not None:
+            return self.model
+
+        try:
+            import fasttext
+        except ImportError as error:
+            raise RuntimeError(
+                "Détection de la langue source indisponible: installer l'extra 'langid' "
+                "(uv sync --extra langid) ou préciser -s/--source-language"
+            ) from error
+
+        try:
+            path = self.model_path
+            if not os.path.isfile(path):
+                from huggingface_hub import hf_hub_download
+                path = hf_hub_download(path, 'model.bin', cache_dir=os.getenv('CACHE_DIR', './.model_cache'))
+            with telemetry.stage('load_language_model'):
+                self.model = fasttext.load_model(path)
+        except Exception as error:
+            raise RuntimeError(f"Erreur lors du chargement du modèle de détection de langue: {str(error)}")
+
+        self.logger.info(f"Modèle de détection de langue chargé: {self.model_path}")
+        return self.model
+
+    def detect(self, texts: list[str], default: Optional[str] = None) -> list[Optional[str]]:
+        """
+        Détecte la langue de chaque segment.
+
+        Args:
+            texts: Segments à classer
+            default: Langue retenue pour un segment sans aucune langue supportée parmi
+                les candidats du modèle, avant la langue majoritaire du document
+
+        Returns:
+            Liste des codes de langue (ordre d'entrée) ; None pour un segment sans
+            langue supportée quand aucun repli n'existe
+        """
+        model = self.load()
+        with telemetry.stage('detect_language'):
+            # fastText classe une ligne par segment : les sauts de ligne sont interdits
+            lines = [" ".join(text.split()) for text in texts]
+            labels, probabilities = model.predict(lines, k=self.candidates)
+
+        detected = []
+        guesses = []
+        for line, candidates, scores in zip(lines, labels, probabilities):
+            language = guess = None
+            for label, score in zip(candidates, scores):
+                code = label[len(self.LABEL_PREFIX):]
+                if code in self.supported_languages:
+                    guess = code
+                    if score >= self.min_confidence and len(line) >= self.min_chars:
+                        language = code
+                    break
+            detected.append(language)
+            guesses.append(guess)
+
+        reliable = Counter(language for language in detected if language)
+        majority = reliable.most_common(1)[0][0] if reliable else None
+        self.document_languages.update(reliable)
+        fallback = default or self.document_language
+        telemetry.count('segments_detected', len(texts))
+        return [language or majority or guess or fallback for language, guess in zip(detected, guesses)]
@@ -1,6 +1,5 @@
 
 from app.cli import NLLBTranslationCLI
-from .optimizations import configure_environment
 
 import os, sys, io
 
@@ -20,6 +19,7 @@ def load_and_verify_env():
     required_vars = {
         'MODEL_NAME': 'facebook/nllb-200-distilled-600M',
         'BATCH_SIZE': 8,
+        'MAX_BATCH_TOKENS': 4096,
         'MAX_LENGTH': 512,
         'USE_GPU': True
     }
@@ -51,8 +51,7 @@ def main():
 
     load_and_verify_env()
 
-    """Point d'entrée avec optimisations"""
-    configure_environment()
+    """Point d'entrée (l'environnement torch est configuré au chargement du modèle)"""
     try:
         cli = NLLBTranslationCLI()
         cli.run()
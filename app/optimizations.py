@@ -1,3 +1,9 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Callable
+
 import torch
 from torch.utils.data import Dataset, DataLoader
 
@@ -21,4 +27,335 @@ def configure_environment():
         torch.cuda.synchronize()
         torch.cuda.empty_cache()
         # Limite l'utilisation mémoire
-        torch.cuda.set_per_process_memory_fraction(0.8)
\ No newline at end of file
+        torch.cuda.set_per_process_memory_fraction(0.8)
+
+
+def model_size_bytes(model: torch.nn.Module) -> int:
+    """Taille des poids d'un modèle (paramètres et buffers, y compris les poids quantifiés)."""
+    total = 0
+    for value in model.state_dict().values():
+        # Les couches quantifiées exposent un tuple (poids, biais) compacté
+        for tensor in (value if isinstance(value, tuple) else (value,)):
+            if isinstance(tensor, torch.Tensor):
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def quantized_model_cache_path(model_name: str, mode: str = 'int8') -> Path:
+    """Emplacement du modèle quantifié en cache (dépend de la version de torch)."""
+    cache_dir = Path(os.getenv('CACHE_DIR', './.model_cache')) / 'quantized'
+    safe_name = model_name.replace('/', '--')
+    return cache_dir / f"{safe_name}-{mode}-torch{torch.__version__}.pt"
+
+
+def load_dynamic_int8_model(model_name: str, load_float_model: Callable[[], torch.nn.Module]) -> torch.nn.Module:
+    """
+    Retourne le modèle avec ses couches linéaires quantifiées dynamiquement en int8 (CPU).
+
+    Le modèle converti est sérialisé dans CACHE_DIR/quantized pour que les démarrages
+    suivants chargent directement les poids quantifiés sans refaire la conversion.
+
+    Args:
+        model_name: Nom du modèle (clé du cache)
+        load_float_model: Fonction chargeant le modèle float32 d'origine
+    """
+    logger = logging.getLogger('T2L')
+    cache_path = quantized_model_cache_path(model_name)
+
+    if cache_path.exists():
+        try:
+            # Fichier produit localement par cette fonction : chargement complet du module
+            model = torch.load(cache_path, weights_only=False)
+            logger.info(f"Modèle int8 chargé depuis le cache: {cache_path}")
+            return model.eval()
+        except Exception as error:
+            logger.warning(f"Cache int8 illisible ({str(error)}), nouvelle conversion")
+
+    model = load_float_model().eval()
+    float_size = model_size_bytes(model)
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    quantized_size = model_size_bytes(model)
+    logger.info(
+        f"Quantification int8: poids {float_size / 2**20:.0f} Mo -> {quantized_size / 2**20:.0f} Mo "
+        f"({1 - quantized_size / float_size:.0%} de moins)"
+    )
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save(model, cache_path)
+    except Exception as error:
+        logger.warning(f"Impossible de mettre en cache le modèle int8: {str(error)}")
+
+    return model
+
+
+def model_snapshot_path(model_name: str, dtype: torch.dtype) -> Path:
+    """Répertoire de l'instantané local d'un modèle (dépend du type et de la version de torch)."""
+    cache_dir = Path(os.getenv('CACHE_DIR', './.model_cache')) / 'snapshots'
+    safe_name = model_name.replace('/', '--')
+    dtype_name = str(dtype).replace('torch.', '')
+    return cache_dir / f"{safe_name}-{dtype_name}-torch{torch.__version__}"
+
+
+def load_model_snapshot(
+    model_name: str,
+    dtype: torch.dtype,
+    load_model: Callable[[], torch.nn.Module],
+    load_tokenizer: Callable[[], object]
+) -> tuple:
+    """
+    Charge le modèle et le tokenizer depuis un instantané local pré-sérialisé.
+
+    L'instantané contient le module complet (weights.pt) et les fichiers du
+    tokenizer. Les poids sont projetés en mémoire (mmap) au lieu d'être lus et
+    convertis : le chargement ne coûte presque que la désérialisation de la
+    structure du modèle. Au premier appel, le modèle est chargé normalement puis
+    l'instantané est écrit pour les exécutions suivantes.
+
+    Args:
+        model_name: Nom du modèle (clé de l'instantané)
+        dtype: Type des poids
+        load_model: Fonction chargeant le modèle d'origine
+        load_tokenizer: Fonction chargeant le tokenizer d'origine
+
+    Returns:
+        tuple: (modèle, tokenizer)
+    """
+    from transformers import AutoTokenizer
+
+    logger = logging.getLogger('T2L')
+    snapshot_dir = model_snapshot_path(model_name, dtype)
+    weights_path = snapshot_dir / 'weights.pt'
+
+    if weights_path.exists():
+        try:
+            # Fichier produit localement par cette fonction : chargement complet du module
+            model = torch.load(weights_path, mmap=True, weights_only=False)
+            tokenizer = AutoTokenizer.from_pretrained(snapshot_dir, use_fast=True)
+            logger.info(f"Modèle chargé depuis l'instantané: {snapshot_dir}")
+            return model.eval(), tokenizer
+        except Exception as error:
+            logger.warning(f"Instantané illisible ({str(error)}), rechargement du modèle d'origine")
+
+    model = load_model().eval()
+    tokenizer = load_tokenizer()
+
+    # Écriture dans un répertoire temporaire : un instantané partiel n'est jamais lu
+    temporary_dir = snapshot_dir.with_name(snapshot_dir.name + '.tmp')
+    try:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        temporary_dir.mkdir(parents=True)
+        tokenizer.save_pretrained(temporary_dir)
+        torch.save(model, temporary_dir / 'weights.pt')
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        temporary_dir.rename(snapshot_dir)
+        logger.info(f"Instantané du modèle enregistré: {snapshot_dir}")
+    except Exception as error:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        logger.warning(f"Impossible d'enregistrer l'instantané du modèle: {str(error)}")
+
+    return model, tokenizer
+
+
+def onnx_export_path(model_name: str) -> Path:
+    """Répertoire de l'export ONNX d'un modèle (encodeur, décodeur avec et sans cache KV)."""
+    cache_dir = Path(os.getenv('CACHE_DIR', './.model_cache')) / 'onnx'
+    return cache_dir / model_name.replace('/', '--')
+
+
+def load_onnx_model(model_name: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+    """
+    Charge le modèle seq2seq exporté en ONNX et l'exécute avec ONNX Runtime (CPU).
+
+    L'export (encodeur, décodeur, décodeur avec past key/values) est fait une seule
+    fois par optimum puis conservé dans CACHE_DIR/onnx. Les sessions utilisent toutes
+    les optimisations de graphe d'ONNX Runtime. Le modèle obtenu expose generate(),
+    get_encoder() et config comme le modèle transformers.
+
+    Args:
+        model_name: Nom du modèle Hugging Face (clé du cache)
+        intra_op_threads: Threads par opérateur (0 = choix d'ONNX Runtime)
+        inter_op_threads: Threads entre opérateurs indépendants (0 = choix d'ONNX Runtime)
+
+    Raises:
+        RuntimeError: Si optimum[onnxruntime] n'est pas installé
+    """
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as error:
+        raise RuntimeError(
+            f"Backend ONNX indisponible ({str(error)}): installer l'extra onnx (uv sync --extra onnx)"
+        )
+
+    logger = logging.getLogger('T2L')
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads > 0:
+        session_options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads > 0:
+        session_options.inter_op_num_threads = inter_op_threads
+        session_options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+
+    export_dir = onnx_export_path(model_name)
+    options = {
+        'use_cache': True,
+        'provider': 'CPUExecutionProvider',
+        'session_options': session_options,
+    }
+
+    if (export_dir / 'config.json').exists():
+        try:
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, **options)
+            logger.info(f"Modèle ONNX chargé depuis le cache: {export_dir}")
+            return model
+        except Exception as error:
+            logger.warning(f"Export ONNX illisible ({str(error)}), nouvel export")
+
+    logger.info(f"Export ONNX de {model_name} (une seule fois)...")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, **options)
+
+    # Écriture dans un répertoire temporaire : un export partiel n'est jamais lu
+    temporary_dir = export_dir.with_name(export_dir.name + '.tmp')
+    try:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        temporary_dir.mkdir(parents=True)
+        model.save_pretrained(temporary_dir)
+        shutil.rmtree(export_dir, ignore_errors=True)
+        temporary_dir.rename(export_dir)
+        logger.info(f"Export ONNX enregistré: {export_dir}")
+    except Exception as error:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        logger.warning(f"Impossible d'enregistrer l'export ONNX: {str(error)}")
+
+    return model
+
+
+def compiled_artifacts_path(model_name: str) -> Path:
+    """Fichier des artefacts de compilation (dépend de la version de torch)."""
+    cache_dir = Path(os.getenv('CACHE_DIR', './.model_cache')) / 'compiled'
+    safe_name = model_name.replace('/', '--')
+    return cache_dir / f"{safe_name}-torch{torch.__version__}.bin"
+
+
+def compile_generation_model(model: torch.nn.Module, mode: str = 'default', max_graphs: int = 16) -> bool:
+    """
+    Compile le forward du modèle avec torch.compile et active un cache KV statique.
+
+    Le cache statique pré-alloue les clés/valeurs à la longueur maximale de
+    génération : les formes restent constantes d'une étape de décodage à l'autre,
+    le graphe compilé est réutilisé au lieu d'être retracé. Le nombre de graphes
+    par fonction est borné (max_graphs) ; au-delà, torch revient à l'exécution eager.
+    Le cache d'Inductor est placé dans CACHE_DIR/compiled pour être réutilisé.
+
+    Returns:
+        bool: True si le cache KV statique est pris en charge par le modèle
+    """
+    cache_dir = Path(os.getenv('CACHE_DIR', './.model_cache')) / 'compiled'
+    os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', str((cache_dir / 'inductor').resolve()))
+    os.environ.setdefault('TORCHINDUCTOR_FX_GRAPH_CACHE', '1')
+
+    dynamo_config = torch._dynamo.config
+    for name in ('recompile_limit', 'cache_size_limit'):
+        if hasattr(dynamo_config, name):
+            setattr(dynamo_config, name, max_graphs)
+            break
+
+    static_cache = bool(getattr(model, '_supports_static_cache', False))
+    if static_cache:
+        model.generation_config.cache_implementation = 'static'
+    # Compilation explicite ci-dessous : pas de seconde compilation automatique par generate()
+    model.generation_config.disable_compile = True
+    model.forward = torch.compile(model.forward, mode=mode)
+    return static_cache
+
+
+def load_compile_artifacts(model_name: str) -> bool:
+    """Recharge les artefacts de compilation d'une exécution précédente (torch >= 2.7)."""
+    path = compiled_artifacts_path(model_name)
+    if not path.exists() or not hasattr(torch.compiler, 'load_cache_artifacts'):
+        return False
+    try:
+        torch.compiler.load_cache_artifacts(path.read_bytes())
+        return True
+    except Exception as error:
+        logging.getLogger('T2L').warning(f"Artefacts de compilation illisibles ({str(error)})")
+        return False
+
+
+def save_compile_artifacts(model_name: str) -> None:
+    """Enregistre les artefacts de compilation produits par le préchauffage (torch >= 2.7)."""
+    if not hasattr(torch.compiler, 'save_cache_artifacts'):
+        return
+    artifacts = torch.compiler.save_cache_artifacts()
+    if artifacts is None:
+        return
+    path = compiled_artifacts_path(model_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(path.name + '.tmp')
+    temporary_path.write_bytes(artifacts[0])
+    temporary_path.replace(path)
+
+
+class PrunedOutputProjection(torch.nn.Module):
+    """
+    Projection de sortie (LM head) calculée sur un sous-ensemble du vocabulaire.
+
+    Seules les lignes de la matrice de projection des tokens retenus sont
+    multipliées ; les autres logits valent le minimum représentable, si bien que
+    la recherche (gloutonne ou en faisceau) ne peut pas les choisir. Les
+    identifiants de tokens restent ceux du vocabulaire complet : aucune
+    correspondance n'est à refaire avant le décodage. Sans restriction active,
+    la projection d'origine est utilisée telle quelle.
+    """
+
+    def __init__(self, projection: torch.nn.Linear):
+        super().__init__()
+        self.projection = projection
+        self.parts = ()
+
+    @property
+    def weight(self) -> torch.Tensor:
+        return self.projection.weight
+
+    def select(self, ids: torch.Tensor) -> tuple:
+        """Extrait les lignes de projection d'un ensemble de tokens (à mettre en cache par l'appelant)."""
+        bias = self.projection.bias
+        return (
+            ids,
+            self.projection.weight.index_select(0, ids),
+            None if bias is None else bias.index_select(0, ids)
+        )
+
+    def restrict(self, *parts: tuple) -> None:
+        """Active une restriction (parties issues de select), ou la retire si aucune partie n'est donnée."""
+        self.parts = parts
+
+    def forward(self, hidden_states: torch.Tensor) -> torch.Tensor:
+        if not self.parts:
+            return self.projection(hidden_states)
+        logits = hidden_states.new_full(
+            (*hidden_states.shape[:-1], self.projection.out_features),
+            torch.finfo(hidden_states.dtype).min
+        )
+        for ids, weight, bias in self.parts:
+            logits.index_copy_(-1, ids, torch.nn.functional.linear(hidden_states, weight, bias))
+        return logits
+
+
+def install_pruned_output_projection(model: torch.nn.Module):
+    """
+    Remplace la projection de sortie du modèle par une PrunedOutputProjection.
+
+    Returns:
+        PrunedOutputProjection, ou None si la projection n'est pas une couche linéaire
+        ordinaire (modèle quantifié par exemple)
+    """
+    projection = model.get_output_embeddings()
+    if isinstance(projection, PrunedOutputProjection):
+        return projection
+    if type(projection) is not torch.nn.Linear:
+        return None
+    pruned = PrunedOutputProjection(projection)
+    model.set_output_embeddings(pruned)
+    return pruned
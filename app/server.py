@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .telemetry import telemetry
+
+DEFAULT_SERVER_URL = "http://127.0.0.1:8765"
+
+
+@dataclass
+class _PendingRequest:
+    """Requête de traduction en attente de regroupement."""
+    texts: list
+    target_language: str
+    source_language: Optional[str]
+    future: asyncio.Future
+    errors: dict = field(default_factory=dict)
+
+
+class TranslationServer:
+    """
+    Serveur HTTP JSON local gardant le modèle NLLB chargé en mémoire.
+
+    Les requêtes reçues pendant une fenêtre de latence configurable sont
+    regroupées par paire de langues et traduites dans des lots partagés.
+
+    Endpoints:
+        GET  /health     -> {"status": "ok"}
+        GET  /metrics    -> mesures au format texte Prometheus (si la télémétrie est active)
+        POST /translate  {"texts": [...], "target_language": ..., "source_language": ...}
+                         -> {"translations": [...], "errors": {index: message}}
+    """
+
+    def __init__(
+        self,
+        translation_service,
+        host: str = '127.0.0.1',
+        port: int = 8765,
+        batch_window_ms: float = 10.0,
+        max_batch_segments: int = 256
+    ):
+        self.translation_service = translation_service
+        self.host = host
+        self.port = port
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_segments = max_batch_segments
+        self.logger = logging.getLogger('T2L')
+        self._queue = None
+        # Un seul thread d'inférence : le modèle et le tokenizer ne sont pas réentrants
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='l2t-inference')
+
+    def run(self) -> None:
+        """Charge le modèle puis sert les requêtes jusqu'à interruption."""
+        self.translation_service.initialize_translation_model()
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self._queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batch_loop())
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.logger.info(f"Serveur de traduction à l'écoute sur http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._executor.shutdown(wait=False)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await self._read_request(reader)
+            status, payload = await self._dispatch(method, path, body)
+        except (asyncio.IncompleteReadError, ValueError) as error:
+            status, payload = 400, {'error': f"Requête invalide: {str(error)}"}
+        except Exception as error:
+            self.logger.error(f"Erreur serveur: {str(error)}")
+            status, payload = 500, {'error': str(error)}
+
+        self._write_response(writer, status, payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        """Route une requête HTTP vers le traitement correspondant."""
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'model': self.translation_service.model_name}
+
+        if method == 'GET' and path == '/metrics' and telemetry.enabled:
+            return 200, telemetry.to_prometheus()
+
+        if method == 'POST' and path == '/translate':
+            telemetry.count('requests')
+            request = json.loads(body.decode('utf-8') or '{}')
+            if not isinstance(request, dict):
+                return 400, {'error': "Le corps de la requête doit être un objet JSON"}
+            texts = request.get('texts')
+            if texts is None and 'text' in request:
+                texts = [request['text']]
+            target_language = request.get('target_language')
+            source_language = request.get('source_language')
+
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                return 400, {'error': "Le champ 'texts' doit être une liste de chaînes"}
+            for lang in (target_language, source_language):
+                if lang is not None and not isinstance(lang, str):
+                    return 400, {'error': f"Code de langue invalide: {lang!r}"}
+                if lang is not None and not self.translation_service.is_language_supported(lang):
+                    return 400, {'error': f"Langue non supportée: {lang}"}
+            if not target_language:
+                return 400, {'error': "Langue cible non spécifiée"}
+            if not texts:
+                return 200, {'translations': [], 'errors': {}}
+
+            pending = _PendingRequest(
+                texts, target_language, source_language, asyncio.get_running_loop().create_future()
+            )
+            await self._queue.put(pending)
+            translations = await pending.future
+            return 200, {'translations': translations, 'errors': pending.errors}
+
+        return 404, {'error': f"Route inconnue: {method} {path}"}
+
+    async def _batch_loop(self) -> None:
+        """Regroupe les requêtes arrivées dans la fenêtre de latence et les traduit ensemble."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            segments = len(batch[0].texts)
+            deadline = loop.time() + self.batch_window
+
+            while segments < self.max_batch_segments:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                segments += len(request.texts)
+
+            groups = {}
+            for request in batch:
+                groups.setdefault((request.source_language, request.target_language), []).append(request)
+
+            for (source_language, target_language), requests in groups.items():
+                await self._translate_group(loop, requests, source_language, target_language)
+
+    async def _translate_group(self, loop, requests: list, source_language: str, target_language: str) -> None:
+        """Traduit en un seul appel les requêtes partageant la même paire de langues."""
+        texts = []
+        owners = []
+        for request in requests:
+            for position, text in enumerate(request.texts):
+                texts.append(text)
+                owners.append((request, position))
+
+        def record_error(idx: int, error: Exception) -> str:
+            request, position = owners[idx]
+            request.errors[position] = str(error)
+            return ""
+
+        try:
+            translations = await loop.run_in_executor(
+                self._executor,
+                lambda: self.translation_service.translate_batch(
+                    texts, target_language, source_language, on_error=record_error
+                )
+            )
+        except Exception as error:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            return
+
+        offset = 0
+        for request in requests:
+            count = len(request.texts)
+            if not request.future.done():
+                request.future.set_result(translations[offset:offset + count])
+            offset += count
+
+        self.logger.debug(f"Lot serveur: {len(requests)} requêtes, {len(texts)} segments")
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> tuple:
+        """Lit une requête HTTP/1.1 minimale (ligne de requête, en-têtes, corps)."""
+        header_block = await reader.readuntil(b"\r\n\r\n")
+        lines = header_block.decode('iso-8859-1').split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], body
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload) -> None:
+        """Écrit la réponse : JSON pour un dictionnaire, texte brut (Prometheus) pour une chaîne."""
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = "application/json; charset=utf-8"
+        writer.write(
+            f"HTTP/1.1 {status} {reasons.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('iso-8859-1') + body
+        )
+
+
+class RemoteTranslationService:
+    """
+    Client du serveur de traduction, utilisable à la place de NLLBTranslationService.
+
+    Expose les mêmes méthodes de traduction ; la liste des langues reste locale.
+    """
+
+    # Nombre de segments envoyés par requête (permet de suivre la progression)
+    REQUEST_CHUNK_SIZE = 64
+
+    def __init__(self, server_url: str, supported_languages: dict, timeout: float = 600.0):
+        self.server_url = server_url.rstrip('/')
+        self.supported_languages = supported_languages
+        self.timeout = timeout
+        self.batch_statistics = {}
+        self.cache_statistics = {}
+
+    @staticmethod
+    def resolve_url(server_url: Optional[str] = None) -> str:
+        """URL du serveur : argument, variable SERVER_URL ou valeur par défaut."""
+        return server_url or os.getenv('SERVER_URL', DEFAULT_SERVER_URL)
+
+    def is_available(self) -> bool:
+        """Vérifie qu'un serveur répond sur l'URL configurée."""
+        try:
+            with urllib.request.urlopen(f"{self.server_url}/health", timeout=0.5) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+
+    def get_supported_languages(self) -> dict:
+        return self.supported_languages
+
+    def is_language_supported(self, language_code: str) -> bool:
+        return language_code in self.supported_languages
+
+    def translate_text(self, text: str, target_language: str, source_language: str = None) -> str:
+        """Traduit un texte unique via le serveur."""
+        return self.translate_batch([text], target_language, source_language)[0]
+
+    def translate_batch(
+        self,
+        texts: list[str],
+        target_language: str,
+        source_language: str = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        on_error: Optional[Callable[[int, Exception], str]] = None,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> list[str]:
+        """
+        Traduit une liste de segments via le serveur (le lotissement est fait côté serveur).
+
+        batch_size et max_batch_tokens sont acceptés pour compatibilité et ignorés.
+        """
+        translations = []
+        for start in range(0, len(texts), self.REQUEST_CHUNK_SIZE):
+            chunk = texts[start:start + self.REQUEST_CHUNK_SIZE]
+            response = self._post('/translate', {
+                'texts': chunk,
+                'target_language': target_language,
+                'source_language': source_language,
+            })
+
+            for position, translated in enumerate(response['translations']):
+                message = response.get('errors', {}).get(str(position))
+                if message is not None:
+                    error = RuntimeError(message)
+                    if on_error is None:
+                        raise RuntimeError(f"Erreur de traduction: {message}")
+                    translated = on_error(start + position, error)
+                translations.append(translated)
+
+            if progress_callback:
+                progress_callback(len(translations))
+
+        return translations
+
+    def translate_batch_multi(
+        self,
+        texts: list[str],
+        target_languages: list[str],
+        source_language: str = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        on_error: Optional[Callable[[int, Exception], str]] = None,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """Traduit une liste de segments vers plusieurs langues (une série de requêtes par langue)."""
+        translations = {}
+        for position, target_language in enumerate(dict.fromkeys(target_languages)):
+            translations[target_language] = self.translate_batch(
+                texts,
+                target_language,
+                source_language,
+                on_error=on_error,
+                progress_callback=progress_callback if position == 0 else None
+            )
+        return translations
+
+    def _post(self, path: str, payload: dict) -> dict:
+        request = urllib.request.Request(
+            f"{self.server_url}{path}",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as error:
+            detail = error.read().decode('utf-8', errors='replace')
+            raise RuntimeError(f"Erreur du serveur de traduction ({error.code}): {detail}")
+        except urllib.error.URLError as error:
+            raise RuntimeError(f"Serveur de traduction injoignable: {str(error.reason)}")
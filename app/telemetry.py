@@ -0,0 +1,241 @@
+import json
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+# Contexte partagé renvoyé quand la télémétrie est désactivée (aucune allocation)
+_DISABLED_STAGE = nullcontext()
+
+
+class _StageTimer:
+    """Chronomètre d'une étape, utilisé comme gestionnaire de contexte."""
+
+    __slots__ = ('telemetry', 'name', 'start')
+
+    def __init__(self, telemetry: "Telemetry", name: str):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self) -> "_StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.telemetry.add_time(self.name, time.perf_counter() - self.start)
+
+
+class Telemetry:
+    """
+    Mesures de performance par étape (lecture, segmentation, tokenisation,
+    génération, décodage, écriture), compteurs de tokens et profondeurs des files du pipeline.
+
+    Désactivée par défaut : stage() renvoie alors un contexte vide partagé et
+    count() retourne immédiatement, le surcoût se limite à un test booléen.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self) -> None:
+        """Active les mesures et remet les compteurs à zéro."""
+        self.reset()
+        self.enabled = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.gauges = {}
+            self.started = time.perf_counter()
+
+    def stage(self, name: str):
+        """Contexte mesurant la durée d'une étape."""
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return _StageTimer(self, name)
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Mesure le temps passé à produire chaque élément d'un itérable (lecture en flux).
+
+        Le temps du consommateur entre deux éléments n'est pas compté.
+        """
+        if not self.enabled:
+            return iter(iterable)
+        return self._timed_iter(name, iter(iterable))
+
+    def _timed_iter(self, name: str, iterator: Iterator) -> Iterator:
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.add_time(name, elapsed)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            stage['calls'] += calls
+            stage['seconds'] += seconds
+            stage['max_seconds'] = max(stage['max_seconds'], seconds / max(calls, 1))
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Incrémente un compteur (tokens, segments, lots...)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """Échantillonne une valeur instantanée (profondeur de file...) : moyenne et maximum."""
+        if not self.enabled:
+            return
+        with self._lock:
+            gauge = self.gauges.setdefault(name, {'samples': 0, 'total': 0.0, 'max': 0.0})
+            gauge['samples'] += 1
+            gauge['total'] += value
+            gauge['max'] = max(gauge['max'], value)
+
+    def snapshot(self) -> dict:
+        """Copie brute des mesures (transmissible entre processus)."""
+        with self._lock:
+            return {
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'counters': dict(self.counters),
+                'gauges': {name: dict(gauge) for name, gauge in self.gauges.items()},
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """Ajoute les mesures d'un autre processus (workers du pool)."""
+        if not self.enabled or not snapshot:
+            return
+        with self._lock:
+            for name, other in snapshot.get('stages', {}).items():
+                stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                stage['calls'] += other['calls']
+                stage['seconds'] += other['seconds']
+                stage['max_seconds'] = max(stage['max_seconds'], other['max_seconds'])
+            for name, value in snapshot.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, other in snapshot.get('gauges', {}).items():
+                gauge = self.gauges.setdefault(name, {'samples': 0, 'total': 0.0, 'max': 0.0})
+                gauge['samples'] += other['samples']
+                gauge['total'] += other['total']
+                gauge['max'] = max(gauge['max'], other['max'])
+
+    def report(self) -> dict:
+        """Rapport d'exécution : durées par étape, débits, remplissage des lots et pic mémoire."""
+        snapshot = self.snapshot()
+        wall_seconds = time.perf_counter() - self.started
+        counters = snapshot['counters']
+        stages = snapshot['stages']
+        gauges = {
+            name: {'mean': gauge['total'] / gauge['samples'], 'max': gauge['max'], 'samples': gauge['samples']}
+            for name, gauge in snapshot['gauges'].items() if gauge['samples']
+        }
+
+        for stage in stages.values():
+            stage['mean_seconds'] = stage['seconds'] / stage['calls'] if stage['calls'] else 0.0
+            stage['share'] = stage['seconds'] / wall_seconds if wall_seconds else 0.0
+
+        generate_seconds = stages.get('generate', {}).get('seconds', 0.0)
+        derived = {}
+        if generate_seconds:
+            derived['output_tokens_per_second'] = counters.get('tokens_out', 0) / generate_seconds
+            derived['input_tokens_per_second'] = counters.get('tokens_in', 0) / generate_seconds
+        if counters.get('padded_tokens'):
+            derived['batch_fill_ratio'] = counters.get('tokens_in', 0) / counters['padded_tokens']
+        if wall_seconds:
+            derived['segments_per_second'] = counters.get('segments', 0) / wall_seconds
+
+        return {
+            'wall_seconds': wall_seconds,
+            'stages': stages,
+            'counters': counters,
+            'gauges': gauges,
+            'derived': derived,
+            'memory': self.peak_memory(),
+        }
+
+    @staticmethod
+    def peak_memory() -> dict:
+        """
+        Pic de mémoire résidente du processus et, si torch est chargé, de l'allocateur CUDA.
+
+        Le module resource n'existe que sous POSIX : sous Windows, le pic vient de psutil
+        s'il est installé, sinon il vaut None.
+        """
+        try:
+            import resource
+        except ImportError:
+            try:
+                import psutil
+                peak_rss = getattr(psutil.Process().memory_info(), 'peak_wset', None)
+            except ImportError:
+                peak_rss = None
+        else:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss est en octets sous macOS, en kilo-octets sous Linux
+            peak_rss = max_rss if sys.platform == 'darwin' else max_rss * 1024
+        memory = {'peak_rss_bytes': peak_rss}
+
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            memory['peak_cuda_bytes'] = torch.cuda.max_memory_allocated()
+        return memory
+
+    def write_report(self, output_path: Union[str, Path], extra: dict = None) -> None:
+        """Écrit le rapport d'exécution au format JSON."""
+        report = self.report()
+        if extra:
+            report.update(extra)
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    def to_prometheus(self, prefix: str = 'l2t') -> str:
+        """Export au format texte Prometheus (endpoint /metrics du serveur)."""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Temps cumulé par étape",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        for name, stage in sorted(report['stages'].items()):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {stage["seconds"]:.6f}')
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Appels par étape",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        for name, stage in sorted(report['stages'].items()):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{name}"}} {stage["calls"]}')
+        for name, value in sorted(report['counters'].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        for name, gauge in sorted(report['gauges'].items()):
+            lines += [
+                f"# TYPE {prefix}_{name} gauge",
+                f'{prefix}_{name}{{stat="mean"}} {gauge["mean"]:.6f}',
+                f'{prefix}_{name}{{stat="max"}} {gauge["max"]}',
+            ]
+        for name, value in sorted(report['derived'].items()):
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value:.6f}"]
+        for name, value in sorted(report['memory'].items()):
+            if value is None:
+                continue
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+# Instance partagée par le CLI, le service de traduction et le serveur
+telemetry = Telemetry()
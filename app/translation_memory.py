@@ -0,0 +1,120 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Union
+
+
+class TranslationMemory:
+    """
+    Mémoire de traduction persistante adressée par contenu.
+
+    Les traductions sont stockées dans une base SQLite, indexées par l'empreinte
+    SHA-256 de (modèle, langue source, langue cible, paramètres de génération,
+    texte normalisé). Un cache LRU en mémoire évite les accès disque répétés.
+    """
+
+    # Limite du nombre de paramètres d'une requête SQLite
+    _QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, db_path: Union[str, Path], lru_size: int = 10000):
+        self.db_path = Path(db_path)
+        self.lru_size = max(0, lru_size)
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL)"
+            )
+            self._connection.commit()
+        except sqlite3.Error as error:
+            raise RuntimeError(f"Erreur d'ouverture de la mémoire de traduction {self.db_path}: {str(error)}")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalise les espaces d'un segment (le tokenizer NLLB les ignore)."""
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(
+        cls,
+        model_name: str,
+        source_language: str,
+        target_language: str,
+        parameters: dict,
+        text: str
+    ) -> str:
+        """Calcule la clé de contenu d'un segment."""
+        payload = json.dumps(
+            [model_name, source_language, target_language, parameters, cls.normalize(text)],
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> dict:
+        """
+        Recherche un ensemble de clés en une passe (LRU puis SQLite).
+
+        Returns:
+            dict: Traductions trouvées, indexées par clé
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+                else:
+                    missing.append(key)
+
+            for start in range(0, len(missing), self._QUERY_CHUNK_SIZE):
+                chunk = missing[start:start + self._QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, translation in rows:
+                    found[key] = translation
+                    self._remember(key, translation)
+
+        return found
+
+    def put_many(self, translations: dict) -> None:
+        """Enregistre un ensemble de traductions (clé -> texte traduit)."""
+        if not translations:
+            return
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)",
+                translations.items()
+            )
+            self._connection.commit()
+            for key, translation in translations.items():
+                self._remember(key, translation)
+
+    def close(self) -> None:
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._connection.close()
+
+    def _remember(self, key: str, translation: str) -> None:
+        """Ajoute une entrée au cache LRU en évinçant la plus ancienne si besoin."""
+        if not self.lru_size:
+            return
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
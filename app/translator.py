@@ -1,11 +1,234 @@
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
-import torch
 import os
 import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
 from dotenv import load_dotenv
 
+from .translation_memory import TranslationMemory
+from .telemetry import telemetry
+from .language_detection import LanguageDetector
+from .utils import TokenAwareSegmenter
+from .vocabulary import TargetVocabulary
+
+# torch et transformers sont importés à la demande : les commandes qui ne
+# chargent pas le modèle (--help, --list-languages, erreurs d'arguments)
+# ne paient pas leur temps d'import.
+
 load_dotenv()  # Charge les variables d'environnement depuis le fichier .env
 
+# Profils de décodage (--profile / DECODING_PROFILE).
+# length_ratio et length_margin bornent la sortie de chaque segment à ratio × tokens source + marge
+# tant que le rapport de la paire de langues n'a pas été appris (voir OutputLengthModel) ;
+# sans valeur : OUTPUT_LENGTH_RATIO et OUTPUT_LENGTH_MARGIN. num_beams=None : valeur de NUM_BEAMS.
+DECODING_PROFILES = {
+    # Recherche gloutonne (cache KV), sortie bornée au plus juste
+    'fast': {'num_beams': 1, 'length_ratio': 1.5, 'length_margin': 10},
+    # Deux faisceaux, ou recherche gloutonne accélérée par un modèle brouillon (ASSISTANT_MODEL)
+    'balanced': {'num_beams': 2, 'length_ratio': 2.0, 'length_margin': 16, 'assistant': True},
+    # Recherche en faisceau complète, borne de sortie par défaut
+    'quality': {'num_beams': None, 'early_stopping': True},
+}
+
+
+def _row_length_criteria(limits: list[int], device):
+    """Critère d'arrêt de generate() : la ligne i s'arrête à limits[i] tokens (préfixe compris)."""
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    limits = torch.tensor(limits, device=device)
+
+    class RowLengthCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return input_ids.shape[-1] >= limits
+
+    return StoppingCriteriaList([RowLengthCriteria()])
+
+
+class LengthBucketScheduler:
+    """
+    Planifie des lots de segments de longueurs proches sous un budget de tokens.
+
+    Le coût d'un lot est estimé à (nombre de segments × longueur du plus long),
+    c'est-à-dire le nombre de tokens après padding.
+    """
+
+    def __init__(self, max_batch_tokens: int, max_batch_size: Optional[int] = None):
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_batch_size = max_batch_size
+
+    def plan(self, lengths: list[int]) -> list[list[int]]:
+        """
+        Regroupe les indices des segments par longueur décroissante.
+
+        Args:
+            lengths: Longueur en tokens de chaque segment
+
+        Returns:
+            Liste de lots, chaque lot étant une liste d'indices dans l'ordre d'origine
+        """
+        order = self.order(lengths)
+        batches = []
+        position = 0
+        while position < len(order):
+            batch = self.take(order, lengths, position)
+            batches.append(batch)
+            position += len(batch)
+        return batches
+
+    @staticmethod
+    def order(lengths: list[int]) -> list[int]:
+        """Indices triés par longueur décroissante."""
+        # Les plus longs d'abord : un dépassement mémoire se manifeste dès le premier lot
+        return sorted(range(len(lengths)), key=lambda idx: lengths[idx], reverse=True)
+
+    def take(self, order: list[int], lengths: list[int], start: int) -> list[int]:
+        """Forme le prochain lot à partir de la position `start` de `order`."""
+        batch = []
+        width = 0
+        for position in range(start, len(order)):
+            idx = order[position]
+            new_width = max(width, lengths[idx], 1)
+            too_many = self.max_batch_size and len(batch) >= self.max_batch_size
+            if batch and (too_many or new_width * (len(batch) + 1) > self.max_batch_tokens):
+                break
+            batch.append(idx)
+            width = new_width
+        return batch
+
+    @staticmethod
+    def describe(batches: list[list[int]], lengths: Optional[list[int]] = None) -> dict:
+        """Calcule les statistiques de remplissage (ratio de padding) d'un plan de lots."""
+        statistics = {
+            'batches': len(batches),
+            'segments': sum(len(batch) for batch in batches),
+        }
+        if lengths is None:
+            return statistics
+
+        real_tokens = sum(lengths[idx] for batch in batches for idx in batch)
+        padded_tokens = sum(max(lengths[idx] for idx in batch) * len(batch) for batch in batches if batch)
+        statistics.update({
+            'real_tokens': real_tokens,
+            'padded_tokens': padded_tokens,
+            'padding_ratio': 1 - real_tokens / padded_tokens if padded_tokens else 0.0,
+        })
+        return statistics
+
+
+class AdaptiveBatchBudget:
+    """
+    Budget de lot ajusté après les dépassements mémoire.
+
+    Un lot en saturation divise le budget par deux (à partir du coût du lot en
+    échec) pour le reste du travail ; après `ramp_after` lots réussis d'affilée,
+    le budget remonte progressivement vers la limite configurée. Une saturation
+    qui suit une remontée double le nombre de succès exigés avant la suivante.
+    L'unité est celle du mode de planification : tokens (padding compris) ou segments.
+    """
+
+    def __init__(self, limit: int, ramp_after: int = 20, growth: float = 1.5):
+        self.limit = max(1, limit)
+        self.current = self.limit
+        self.largest_safe = 0
+        self.ramp_after = max(1, ramp_after)
+        self.growth = growth
+        self.failures = 0
+        self._successes = 0
+        self._raised = False
+
+    def record_success(self, cost: int) -> Optional[int]:
+        """Enregistre un lot réussi ; retourne le nouveau budget s'il a été relevé."""
+        self.largest_safe = max(self.largest_safe, cost)
+        if self.current >= self.limit:
+            return None
+
+        self._successes += 1
+        if self._successes < self.ramp_after:
+            return None
+
+        self._successes = 0
+        self._raised = True
+        self.current = min(self.limit, max(self.current + 1, int(self.current * self.growth)))
+        return self.current
+
+    def record_failure(self, cost: int) -> int:
+        """Enregistre un lot en saturation mémoire ; retourne le budget réduit."""
+        if self._raised:
+            # Rechute après une remontée : la suivante sera plus prudente
+            self.ramp_after *= 2
+            self._raised = False
+        self.failures += 1
+        self._successes = 0
+        self.current = max(1, min(self.current, cost // 2))
+        return self.current
+
+
+class OutputLengthModel:
+    """
+    Rapport (tokens produits / tokens source) par paire de langues, appris d'une exécution à l'autre.
+
+    Seules les traductions terminées normalement (fin de séquence atteinte) sont
+    observées. La moyenne et la variance sont tenues à jour en ligne (Welford) et
+    enregistrées en JSON ; le rapport retenu pour borner la sortie est
+    moyenne + `deviations` écarts-types, dès `min_samples` observations.
+    """
+
+    # Segments trop courts pour un rapport significatif
+    MIN_SOURCE_TOKENS = 4
+
+    def __init__(self, path: str, min_samples: int = 50, deviations: float = 3.0):
+        self.path = path
+        self.min_samples = min_samples
+        self.deviations = deviations
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.pairs = json.load(f)
+        except (OSError, ValueError):
+            self.pairs = {}
+
+    @staticmethod
+    def key(source_language: Optional[str], target_language: str) -> str:
+        return f"{source_language or 'auto'}>{target_language}"
+
+    def ratio(self, source_language: Optional[str], target_language: str) -> Optional[float]:
+        """Rapport appris pour la paire, None tant que les observations sont insuffisantes."""
+        statistics = self.pairs.get(self.key(source_language, target_language))
+        if not statistics or statistics['count'] < self.min_samples:
+            return None
+        deviation = (statistics['m2'] / (statistics['count'] - 1)) ** 0.5
+        return statistics['mean'] + self.deviations * deviation
+
+    def observe(self, source_language: Optional[str], target_language: str,
+                source_tokens: int, output_tokens: int) -> None:
+        """Ajoute une traduction terminée aux statistiques de la paire."""
+        if source_tokens < self.MIN_SOURCE_TOKENS:
+            return
+        statistics = self.pairs.setdefault(
+            self.key(source_language, target_language), {'count': 0, 'mean': 0.0, 'm2': 0.0}
+        )
+        value = output_tokens / source_tokens
+        statistics['count'] += 1
+        delta = value - statistics['mean']
+        statistics['mean'] += delta / statistics['count']
+        statistics['m2'] += delta * (value - statistics['mean'])
+        self._dirty = True
+
+    def save(self) -> None:
+        """Enregistre les statistiques si elles ont changé (écriture atomique)."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.pairs, f, indent=2)
+        os.replace(temporary, self.path)
+        self._dirty = False
+
+
 class NLLBTranslationService:
     """
     Service de traduction utilisant le modèle NLLB (No Language Left Behind) de Facebook/Meta.
@@ -17,11 +240,46 @@ class NLLBTranslationService:
         self.translation_model = None
         self.tokenizer = None
         self._is_model_loaded = False
-        self.translation_pipeline = None
+        self.device = None
+        self.batch_statistics = {}
+        self.cache_statistics = {}
+        # Paires (segment, langue cible) arrêtées par leur borne de longueur : jamais mises en mémoire
+        self.capped_outputs = set()
+        self.batch_budgets = {}
+        self.segmenter = None
+        # Le tokenizer rapide n'accepte pas d'appels concurrents (étapes du pipeline, lecture anticipée)
+        self._tokenizer_lock = threading.Lock()
+        self.model_name = os.getenv('MODEL_NAME', "facebook/nllb-200-distilled-600M")
+        # Moteur d'inférence : torch (PyTorch eager) ou onnx (ONNX Runtime, CPU)
+        self.backend = os.getenv('INFERENCE_BACKEND', 'torch').strip().lower() or 'torch'
+        self.quantization = os.getenv('QUANTIZATION', '').strip().lower() or None
+        # Recherche en faisceau (None : réglage de generation_config du modèle)
+        self.num_beams = None
+        self.decoding_profile = os.getenv('DECODING_PROFILE', '').strip().lower() or None
+        self.assistant_model = None
+        self.output_lengths = None
+        self.compile_model = os.getenv('COMPILE_MODEL', 'False').lower() in ('true', '1', 't')
+        # Longueurs (entrée et sortie) arrondies à ce multiple en mode compilé : formes en nombre borné
+        self.compile_bucket = max(1, int(os.getenv('COMPILE_BUCKET', 32)))
+        self._compiled = False
+        self._warming_up = False
+        # Projection de sortie restreinte au vocabulaire des langues cibles (VOCABULARY_DIR)
+        self.vocabulary_pruning = os.getenv('VOCAB_PRUNING', 'False').lower() in ('true', '1', 't')
+        self.vocabularies = None
+        self._output_projection = None
+        self._vocabulary_subsets = {}
+        self.use_model_snapshot = os.getenv('MODEL_SNAPSHOT', 'False').lower() in ('true', '1', 't')
+        self.logger = logging.getLogger('T2L')
+        self.use_translation_memory = os.getenv('USE_TRANSLATION_MEMORY', 'True').lower() in ('true', '1', 't')
+        self.translation_memory = None
+        self.language_detector = None
         self.supported_languages = self._load_language_support_config()
     
     def reload_model(self, force_download: bool = False):
         """Recharge le modèle avec option de suppression du cache local"""
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
         model_name = os.getenv('MODEL_NAME', "facebook/nllb-200-distilled-600M")
         
         # 1. Suppression du cache local si demandé
@@ -53,6 +311,7 @@ class NLLBTranslationService:
             local_files_only=False
         )
         
+        self.device = self.translation_model.device
         self._is_model_loaded = True
     #    self.logger.info("Modèle rechargé depuis Hugging Face")
 
@@ -85,40 +344,166 @@ class NLLBTranslationService:
             return
 
         try:
+            import torch
+            from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+            from .optimizations import (
+                configure_environment, load_dynamic_int8_model, load_model_snapshot, load_onnx_model
+            )
+
+            configure_environment()
+
             # Configuration pour performance optimale
             precision = torch.float16 if torch.cuda.is_available() else torch.float32
             model_name = os.getenv('MODEL_NAME', "facebook/nllb-200-distilled-600M")
 
+            if self.backend not in ('torch', 'onnx'):
+                self.logger.warning(f"Backend d'inférence inconnu ({self.backend}), utilisation de torch")
+                self.backend = 'torch'
+
+            if self.quantization and (
+                self.quantization != 'int8' or torch.cuda.is_available() or self.backend != 'torch'
+            ):
+                self.logger.warning(f"Quantification {self.quantization} ignorée (torch sur CPU uniquement, mode int8)")
+                self.quantization = None
+
             # Chargement du modèle
-            self.translation_model = AutoModelForSeq2SeqLM.from_pretrained(
-                model_name,
-                device_map="auto",
-                torch_dtype=precision
-            )
+            tokenizer = None
+            if self.backend == 'onnx':
+                # Graphe exporté une fois (CACHE_DIR/onnx), exécuté par ONNX Runtime sur CPU
+                self.translation_model = load_onnx_model(
+                    model_name,
+                    intra_op_threads=int(os.getenv('ORT_INTRA_OP_THREADS', 0)),
+                    inter_op_threads=int(os.getenv('ORT_INTER_OP_THREADS', 0))
+                )
+            elif self.quantization == 'int8':
+                # Quantification dynamique des couches linéaires (inférence CPU)
+                self.translation_model = load_dynamic_int8_model(
+                    model_name,
+                    lambda: AutoModelForSeq2SeqLM.from_pretrained(model_name, torch_dtype=torch.float32)
+                )
+            elif self.use_model_snapshot:
+                # Poids projetés en mémoire (mmap) depuis l'instantané local
+                self.translation_model, tokenizer = load_model_snapshot(
+                    model_name,
+                    precision,
+                    lambda: AutoModelForSeq2SeqLM.from_pretrained(model_name, torch_dtype=precision),
+                    lambda: AutoTokenizer.from_pretrained(model_name, use_fast=True)
+                )
+                if torch.cuda.is_available():
+                    self.translation_model.to('cuda')
+            else:
+                self.translation_model = AutoModelForSeq2SeqLM.from_pretrained(
+                    model_name,
+                    device_map="auto",
+                    torch_dtype=precision
+                )
+            if self.backend == 'torch':
+                self.translation_model.eval()
+
+            # Placement décidé une seule fois : les appels suivants n'y touchent plus
+            self.device = self.translation_model.device
 
             # Chargement du tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(
+            self.tokenizer = tokenizer or AutoTokenizer.from_pretrained(
                 model_name,
                 use_fast=True  # Tokenizer rapide
             )
 
-            # Configuration du pipeline de traduction
-            self.translation_pipeline = pipeline(
-                "translation",
-                model=self.translation_model,
-                tokenizer=self.tokenizer,
-                truncation=True,
-                max_length=int(os.getenv('MAX_LENGTH', 512))
-            )
+            if self.decoding_profile not in (None, *DECODING_PROFILES):
+                self.logger.warning(f"Profil de décodage inconnu ignoré: {self.decoding_profile}")
+                self.decoding_profile = None
+
+            assistant_name = os.getenv('ASSISTANT_MODEL', '').strip()
+            if (
+                assistant_name
+                and self.backend == 'torch'
+                and DECODING_PROFILES.get(self.decoding_profile, {}).get('assistant')
+            ):
+                # Modèle brouillon de la même famille (vocabulaire partagé), ex. NLLB 600M pour NLLB 3.3B
+                self.assistant_model = AutoModelForSeq2SeqLM.from_pretrained(
+                    assistant_name, torch_dtype=precision
+                ).to(self.device).eval()
+                self.logger.info(f"Décodage assisté par {assistant_name}")
 
             self._is_model_loaded = True
+
+            if self.vocabulary_pruning:
+                self._install_output_projection()
+
+            if self.compile_model:
+                self._compile_translation_model()
             
         except Exception as error:
             raise RuntimeError(f"Erreur lors du chargement du modèle: {str(error)}")
 
+    def _install_output_projection(self) -> None:
+        """Remplace la projection de sortie par une projection restreignable au vocabulaire cible."""
+        from .optimizations import install_pruned_output_projection
+
+        if self.backend != 'torch' or self.compile_model:
+            self.logger.warning("Vocabulaire réduit ignoré (backend torch non compilé uniquement)")
+            return
+        self._output_projection = install_pruned_output_projection(self.translation_model)
+        if self._output_projection is None:
+            self.logger.warning("Vocabulaire réduit ignoré: projection de sortie non linéaire (modèle quantifié ?)")
+            return
+        self.vocabularies = self.vocabularies or TargetVocabulary()
+        self._vocabulary_subsets = {}
+
+    def _compile_translation_model(self) -> None:
+        """
+        Compile le modèle (torch.compile, cache KV statique) puis le préchauffe.
+
+        Le préchauffage traduit des segments synthétiques de longueurs représentatives
+        (COMPILE_WARMUP_LENGTHS tokens, lots de COMPILE_WARMUP_BATCHES segments) pour que
+        les graphes soient compilés avant la première vraie traduction. Les artefacts
+        sont rechargés puis enregistrés dans CACHE_DIR/compiled d'une exécution à l'autre.
+        """
+        from .optimizations import compile_generation_model, load_compile_artifacts, save_compile_artifacts
+
+        if self.backend != 'torch' or self.quantization:
+            self.logger.warning("Compilation ignorée (modèle torch non quantifié uniquement)")
+            return
+
+        start = time.perf_counter()
+        reused = load_compile_artifacts(self.model_name)
+        static_cache = compile_generation_model(
+            self.translation_model,
+            mode=os.getenv('COMPILE_MODE', 'default'),
+            max_graphs=int(os.getenv('COMPILE_MAX_GRAPHS', 16))
+        )
+        self._compiled = True
+        if not static_cache:
+            self.logger.warning("Cache KV statique non pris en charge par le modèle: compilation avec cache dynamique")
+
+        lengths = [int(value) for value in os.getenv('COMPILE_WARMUP_LENGTHS', '16,64,192').split(',') if value]
+        batch_sizes = [int(value) for value in os.getenv('COMPILE_WARMUP_BATCHES', '1,8').split(',') if value]
+        # Textes synthétiques : exclus de l'apprentissage des longueurs de sortie
+        self._warming_up = True
+        try:
+            for length in lengths:
+                text = " ".join(["translation"] * max(1, length))
+                for batch_size in batch_sizes:
+                    self._generate_batch([text] * batch_size, [['fra_Latn']] * batch_size, 'eng_Latn')
+        except Exception as error:
+            # Les formes non préchauffées seront compilées à la première traduction
+            self.logger.warning(f"Préchauffage interrompu: {str(error)}")
+        finally:
+            self._warming_up = False
+
+        if not reused:
+            save_compile_artifacts(self.model_name)
+        self.logger.info(
+            f"Modèle compilé et préchauffé en {time.perf_counter() - start:.1f}s "
+            f"({len(lengths)} longueurs × {len(batch_sizes)} tailles de lot"
+            f"{', artefacts réutilisés' if reused else ''})"
+        )
+
     def batch_translate_texts(self, texts: list[str], target_language: str, source_language: str = None) -> list[str]:
         """
         Traduit une liste de textes en batch pour une meilleure performance.
+
+        Alias de translate_batch : même moteur de génération que translate_text.
         
         Args:
             texts: Liste des textes à traduire
@@ -131,27 +516,1092 @@ class NLLBTranslationService:
         Raises:
             RuntimeError: Si la traduction échoue
         """
+        return self.translate_batch(texts, target_language, source_language)
+
+    def translate_batch(
+        self,
+        texts: list[str],
+        target_language: str,
+        source_language: str = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        on_error: Optional[Callable[[int, Exception], str]] = None,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> list[str]:
+        """
+        Traduit une liste de segments par lots (encodage, génération et décodage groupés).
+
+        Tous les segments sont d'abord recherchés dans la mémoire de traduction, puis
+        les segments manquants (dédoublonnés) sont triés par longueur en tokens et
+        regroupés sous un budget de tokens par lot (MAX_BATCH_TOKENS) afin de limiter
+        le padding. Les résultats sont renvoyés dans l'ordre des textes d'entrée.
+        Un lot en échec est redécoupé en deux jusqu'à isoler le ou les segments fautifs.
+
+        Args:
+            texts: Liste des segments à traduire
+            target_language: Code langue cible
+            source_language: Code langue source
+            batch_size: Nombre maximal de segments par lot (optionnel)
+            max_batch_tokens: Budget de tokens par lot, padding compris
+                (MAX_BATCH_TOKENS par défaut, 0 pour des lots de taille fixe)
+            on_error: Fonction (index, erreur) -> texte de remplacement pour un segment
+                en échec. Si absente, l'erreur est propagée.
+            progress_callback: Fonction appelée avec le nombre de segments traités
+
+        Returns:
+            Liste des textes traduits
+
+        Raises:
+            RuntimeError: Si un segment échoue et qu'aucun on_error n'est fourni
+        """
+        return self.translate_batch_multi(
+            texts,
+            [target_language],
+            source_language,
+            batch_size=batch_size,
+            max_batch_tokens=max_batch_tokens,
+            on_error=on_error,
+            progress_callback=progress_callback
+        )[target_language]
+
+    def translate_batch_multi(
+        self,
+        texts: list[str],
+        target_languages: list[str],
+        source_language: str = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        on_error: Optional[Callable[[int, Exception], str]] = None,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        Traduit une liste de segments vers plusieurs langues cibles en une passe.
+
+        Chaque segment est tokenisé et encodé une seule fois ; les sorties de
+        l'encodeur sont réutilisées pour toutes les langues cibles, seules les
+        générations (paires segment × langue) partagent ensuite les lots.
+        Sans langue source, la langue de chaque segment est détectée et les segments
+        sont traduits par groupes de même langue (un seul src_lang par lot).
+        Mêmes paramètres que translate_batch.
+
+        Returns:
+            dict: Langue cible -> liste des textes traduits (ordre d'entrée)
+        """
+        target_languages = list(dict.fromkeys(target_languages))
+        if not texts:
+            return {target: [] for target in target_languages}
+
+        if source_language is not None:
+            return self._translate_batch_multi(
+                texts, target_languages, source_language, batch_size, max_batch_tokens, on_error, progress_callback
+            )
+
+        groups = {}
+        for idx, language in enumerate(self.detect_source_languages(texts)):
+            groups.setdefault(language, []).append(idx)
+        self.logger.info("Langues source détectées: " + ", ".join(
+            f"{language or 'inconnue'} ({len(indices)})" for language, indices in groups.items()
+        ))
+        # Sans langue source, le tokenizer garderait la langue du lot précédent
+        undetected = groups.pop(None, [])
+        if undetected and on_error is None:
+            raise RuntimeError(
+                f"Langue source non détectée pour {len(undetected)} segments (préciser -s/--source-language)"
+            )
+        if len(groups) == 1 and not undetected:
+            return self._translate_batch_multi(
+                texts, target_languages, next(iter(groups)), batch_size, max_batch_tokens, on_error, progress_callback
+            )
+
+        translations = {target: [None] * len(texts) for target in target_languages}
+        for idx in undetected:
+            placeholder = on_error(idx, RuntimeError("Langue source non détectée"))
+            for target in target_languages:
+                translations[target][idx] = placeholder
+        completed = len(undetected)
+        if progress_callback and completed:
+            progress_callback(completed)
+
+        batch_statistics = {}
+        cache_statistics = {}
+        for language, indices in groups.items():
+            group_translations = self._translate_batch_multi(
+                [texts[idx] for idx in indices],
+                target_languages,
+                language,
+                batch_size,
+                max_batch_tokens,
+                on_error and (lambda idx, error, indices=indices: on_error(indices[idx], error)),
+                progress_callback and (lambda count, offset=completed: progress_callback(offset + count))
+            )
+            for target, group_texts in group_translations.items():
+                for idx, translated in zip(indices, group_texts):
+                    translations[target][idx] = translated
+            completed += len(indices)
+
+            for totals, statistics in ((batch_statistics, self.batch_statistics),
+                                       (cache_statistics, self.cache_statistics)):
+                for name, value in statistics.items():
+                    totals[name] = totals.get(name, 0) + value
+
+        if batch_statistics.get('padded_tokens'):
+            batch_statistics['padding_ratio'] = 1 - batch_statistics['real_tokens'] / batch_statistics['padded_tokens']
+        self.batch_statistics = batch_statistics
+        self.cache_statistics = cache_statistics
+        return translations
+
+    def detect_source_languages(self, texts: list[str]) -> list[str]:
+        """
+        Détecte la langue source de chaque segment (voir LanguageDetector).
+
+        Raises:
+            RuntimeError: Si le modèle de détection est indisponible
+        """
+        if self.language_detector is None:
+            self.language_detector = LanguageDetector(self.supported_languages)
+        return self.language_detector.detect(texts)
+
+    def _translate_batch_multi(
+        self,
+        texts: list[str],
+        target_languages: list[str],
+        source_language: Optional[str],
+        batch_size: Optional[int],
+        max_batch_tokens: Optional[int],
+        on_error: Optional[Callable[[int, Exception], str]],
+        progress_callback: Optional[Callable[[int], None]]
+    ) -> dict:
+        """Traduit des segments d'une même langue source (voir translate_batch_multi)."""
+        self.batch_statistics = {}
+        self.cache_statistics = {}
+        self.capped_outputs = set()
+        translations = {target: [None] * len(texts) for target in target_languages}
+        keys = {
+            target: self._lookup_translation_memory(texts, target, source_language, translations[target])
+            for target in target_languages
+        }
+
+        # Segments restant à traduire, les doublons ne partent qu'une fois au modèle
+        pending = []
+        missing_targets = {}
+        duplicates = {}
+        first_occurrence = {}
+        for idx, text in enumerate(texts):
+            missing = [target for target in target_languages if translations[target][idx] is None]
+            if not missing:
+                continue
+            normalized = TranslationMemory.normalize(text)
+            if normalized in first_occurrence:
+                duplicates[idx] = first_occurrence[normalized]
+            else:
+                first_occurrence[normalized] = idx
+                pending.append(idx)
+                missing_targets[idx] = missing
+
+        if 'hits' in self.cache_statistics:
+            self.cache_statistics['duplicates'] = len(duplicates)
+        completed = len(texts) - len(pending) - len(duplicates)
+        if progress_callback and completed:
+            progress_callback(completed)
+
+        failures = {}
+        placeholders = {}
+        capped = set()
+
+        if pending:
+            if not self._is_model_loaded:
+                self.initialize_translation_model()
+
+            # Les segments au-delà de la limite du modèle sont traduits par morceaux
+            pieces, owners, starts = self._split_oversized_segments([texts[idx] for idx in pending])
+            piece_rows = [None] * len(pieces)
+            remaining = [starts[position + 1] - starts[position] for position in range(len(pending))]
+
+            def record_failure(piece: int, error: Exception) -> str:
+                idx = pending[owners[piece]]
+                if idx not in failures:
+                    failures[idx] = error
+                    placeholders[idx] = on_error(idx, error)
+                return placeholders[idx]
+
+            for piece_positions, batch_translations in self._run_scheduled_batches(
+                pieces,
+                [missing_targets[pending[owner]] for owner in owners],
+                source_language,
+                batch_size,
+                max_batch_tokens,
+                record_failure if on_error else None
+            ):
+                finished = 0
+                for piece, row in zip(piece_positions, batch_translations):
+                    piece_rows[piece] = row
+                    position = owners[piece]
+                    remaining[position] -= 1
+                    if remaining[position]:
+                        continue
+
+                    finished += 1
+                    idx = pending[position]
+                    for target in missing_targets[idx]:
+                        if idx in failures:
+                            translations[target][idx] = placeholders[idx]
+                        else:
+                            translations[target][idx] = " ".join(
+                                piece_rows[other][target] for other in range(starts[position], starts[position + 1])
+                            )
+
+                completed += finished
+                if progress_callback and finished:
+                    progress_callback(completed)
+
+            # Un segment dont un morceau a atteint sa borne n'est pas mis en mémoire de traduction
+            capped = {
+                (idx, target)
+                for position, idx in enumerate(pending)
+                for target in missing_targets[idx]
+                if any(
+                    (pieces[piece], target) in self.capped_outputs
+                    for piece in range(starts[position], starts[position + 1])
+                )
+            }
+
+        for idx, original_idx in duplicates.items():
+            for target in target_languages:
+                if translations[target][idx] is not None:
+                    continue
+                if original_idx in failures:
+                    translations[target][idx] = on_error(idx, failures[original_idx])
+                else:
+                    translations[target][idx] = translations[target][original_idx]
+
+        memory = self._get_translation_memory()
+        if memory is not None:
+            memory.put_many({
+                keys[target][idx]: translations[target][idx]
+                for idx in pending if idx not in failures
+                for target in missing_targets[idx]
+                if (idx, target) not in capped
+            })
+
+        if progress_callback and duplicates:
+            progress_callback(len(texts))
+
+        if self.output_lengths is not None:
+            self.output_lengths.save()
+        return translations
+
+    def _run_scheduled_batches(
+        self,
+        texts: list[str],
+        targets: list[list[str]],
+        source_language: str,
+        batch_size: Optional[int],
+        max_batch_tokens: Optional[int],
+        on_error: Optional[Callable[[int, Exception], str]]
+    ):
+        """
+        Forme les lots au fil de l'eau puis les traduit un par un (générateur de (indices, traductions)).
+
+        La taille des lots suit un budget adaptatif (voir AdaptiveBatchBudget) conservé
+        sur le service : après une saturation mémoire, les lots suivants sont formés
+        sous le budget réduit, y compris lors des appels ultérieurs du même travail.
+        """
+        if max_batch_tokens is None:
+            max_batch_tokens = int(os.getenv('MAX_BATCH_TOKENS', 4096))
+
+        if max_batch_tokens > 0:
+            lengths = self._measure_token_lengths(texts, source_language)
+            # Chaque segment est généré une fois par langue cible manquante
+            fan_out = max(len(row) for row in targets)
+            budget = self._batch_budget('tokens', max_batch_tokens)
+            order = LengthBucketScheduler.order(lengths)
+        else:
+            # Mode historique : lots de taille fixe dans l'ordre du document
+            batch_size = max(1, batch_size or int(os.getenv('BATCH_SIZE', 8)))
+            lengths = None
+            budget = self._batch_budget('segments', batch_size)
+
+        self.batch_statistics = LengthBucketScheduler.describe([], lengths)
+        self.batch_statistics['oom_retries'] = 0
+        self.batch_statistics['length_capped'] = 0
+        self.batch_statistics['vocabulary_fallbacks'] = 0
+
+        def plan_batches():
+            position = 0
+            while position < len(texts):
+                if lengths is not None:
+                    scheduler = LengthBucketScheduler(max(1, budget.current // fan_out), batch_size)
+                    batch_indices = scheduler.take(order, lengths, position)
+                else:
+                    batch_indices = list(range(position, min(position + budget.current, len(texts))))
+                position += len(batch_indices)
+                self._add_batch_statistics(batch_indices, lengths)
+                yield batch_indices
+
+        depth = int(os.getenv('PIPELINE_DEPTH', 2))
+        if depth > 0:
+            yield from self._run_pipeline(
+                plan_batches(), texts, targets, source_language, on_error, budget, lengths, depth
+            )
+            return
+
+        for batch_indices in plan_batches():
+            yield batch_indices, self._translate_batch_resilient(
+                [texts[idx] for idx in batch_indices],
+                [targets[idx] for idx in batch_indices],
+                batch_indices,
+                source_language,
+                on_error,
+                budget,
+                lengths
+            )
+
+    def _run_pipeline(
+        self,
+        batches,
+        texts: list[str],
+        targets: list[list[str]],
+        source_language: str,
+        on_error: Optional[Callable[[int, Exception], str]],
+        budget: AdaptiveBatchBudget,
+        lengths: Optional[list[int]],
+        depth: int
+    ):
+        """
+        Exécute les lots en pipeline : tokenisation, génération et décodage se recouvrent.
+
+        Un thread tokenise les lots N+1, N+2... pendant que le modèle génère le lot N
+        dans le thread appelant ; un second thread décode le lot N-1. Les files entre
+        étapes sont bornées à `depth` lots (PIPELINE_DEPTH), ce qui limite la mémoire
+        et la distance entre la formation d'un lot et le budget courant. Un lot en
+        échec repasse par le chemin séquentiel (redécoupage, budget réduit).
+        Les profondeurs de file sont échantillonnées à chaque lot (télémétrie) :
+        une file d'encodage vide signale une tokenisation trop lente, une file de
+        décodage pleine un décodage trop lent.
+        """
+        encoded = queue.Queue(maxsize=depth)
+        generated = queue.Queue(maxsize=depth)
+        completed = queue.Queue()
+        stop = threading.Event()
+
+        def put(target_queue: queue.Queue, item) -> bool:
+            # Attente interruptible : le consommateur peut abandonner le générateur
+            while not stop.is_set():
+                try:
+                    target_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def encode_stage():
+            try:
+                for batch_indices in batches:
+                    try:
+                        batch = self._encode_batch(
+                            [texts[idx] for idx in batch_indices],
+                            [targets[idx] for idx in batch_indices],
+                            source_language
+                        )
+                        item = (batch_indices, batch, None)
+                    except Exception as error:
+                        item = (batch_indices, None, error)
+                    if not put(encoded, item):
+                        return
+            except Exception as error:
+                put(encoded, (None, None, error))
+                return
+            put(encoded, None)
+
+        def decode_stage():
+            while not stop.is_set():
+                try:
+                    item = generated.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    completed.put(None)
+                    return
+                batch_indices, batch, output = item
+                if batch is not None:
+                    try:
+                        output = self._decode_batch(batch, output)
+                    except Exception as error:
+                        batch, output = None, error
+                completed.put((batch_indices, batch is not None, output))
+
+        def collect(block: bool):
+            # Résultats décodés, dans l'ordre des lots ; les échecs sont retraduits ici
+            while True:
+                try:
+                    item = completed.get(block=block)
+                except queue.Empty:
+                    return
+                if item is None:
+                    return
+                batch_indices, success, output = item
+                batch_texts = [texts[idx] for idx in batch_indices]
+                batch_targets = [targets[idx] for idx in batch_indices]
+                if success:
+                    self._record_batch_success(batch_targets, batch_indices, budget, lengths)
+                elif isinstance(output, Exception):
+                    output = self._recover_failed_batch(
+                        output, batch_texts, batch_targets, batch_indices, source_language,
+                        on_error, budget, lengths
+                    )
+                yield batch_indices, output
+
+        threads = [
+            threading.Thread(target=encode_stage, name='l2t-tokenize', daemon=True),
+            threading.Thread(target=decode_stage, name='l2t-decode', daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                telemetry.gauge('queue_encoded', encoded.qsize())
+                telemetry.gauge('queue_generated', generated.qsize())
+                with telemetry.stage('wait_encoded'):
+                    item = encoded.get()
+                if item is None:
+                    break
+                batch_indices, batch, error = item
+                if batch_indices is None:
+                    raise error
+
+                if batch is None:
+                    generated.put((batch_indices, None, error))
+                else:
+                    try:
+                        output = self._generate_tokens(batch)
+                    except Exception as generate_error:
+                        batch, output = None, generate_error
+                    with telemetry.stage('wait_generated'):
+                        generated.put((batch_indices, batch, output))
+
+                yield from collect(block=False)
+
+            generated.put(None)
+            yield from collect(block=True)
+        finally:
+            # Arrête les étapes si le consommateur abandonne le générateur ou sur erreur
+            stop.set()
+
+    def _batch_budget(self, unit: str, limit: int) -> AdaptiveBatchBudget:
+        """Budget adaptatif associé à une limite configurée (créé au premier usage)."""
+        key = (unit, limit)
+        if key not in self.batch_budgets:
+            self.batch_budgets[key] = AdaptiveBatchBudget(
+                limit,
+                ramp_after=int(os.getenv('BATCH_RAMP_AFTER', 20))
+            )
+        return self.batch_budgets[key]
+
+    def _add_batch_statistics(self, batch_indices: list[int], lengths: Optional[list[int]]) -> None:
+        """Ajoute un lot aux statistiques de remplissage du dernier appel."""
+        statistics = self.batch_statistics
+        statistics['batches'] += 1
+        statistics['segments'] += len(batch_indices)
+        if lengths is None or not batch_indices:
+            return
+
+        statistics['real_tokens'] += sum(lengths[idx] for idx in batch_indices)
+        statistics['padded_tokens'] += max(lengths[idx] for idx in batch_indices) * len(batch_indices)
+        statistics['padding_ratio'] = 1 - statistics['real_tokens'] / statistics['padded_tokens']
+
+    def count_tokens(self, texts: list[str]) -> list[int]:
+        """Longueur en tokens de chaque texte, hors tokens spéciaux (tokenisation groupée)."""
         if not self._is_model_loaded:
             self.initialize_translation_model()
+        with self._tokenizer_lock:
+            encoded = self.tokenizer(texts, add_special_tokens=False)
+        return [len(input_ids) for input_ids in encoded["input_ids"]]
+
+    def get_segmenter(self) -> TokenAwareSegmenter:
+        """Segmenteur par phrases mesurant les longueurs avec le tokenizer du modèle."""
+        if self.segmenter is None:
+            self.segmenter = TokenAwareSegmenter(
+                self.count_tokens,
+                target_tokens=int(os.getenv('SEGMENT_TARGET_TOKENS', 200)),
+                max_tokens=self._max_input_tokens()
+            )
+        return self.segmenter
+
+    @staticmethod
+    def _max_input_tokens() -> int:
+        """Tokens de texte acceptés par segment (MAX_LENGTH moins la langue source et la fin de séquence)."""
+        return max(1, int(os.getenv('MAX_LENGTH', 1024)) - 2)
+
+    def _split_oversized_segments(self, texts: list[str]) -> tuple:
+        """
+        Découpe sur les fins de phrase les segments plus longs que la limite du modèle.
+
+        Returns:
+            tuple: (morceaux à traduire, segment d'origine de chaque morceau,
+                position du premier morceau de chaque segment suivie du total)
+        """
+        limit = self._max_input_tokens()
+        # Au moins un caractère par token : seuls les textes assez longs sont mesurés
+        candidates = [idx for idx, text in enumerate(texts) if len(text) > limit]
+        oversized = set()
+        if candidates:
+            counts = self.get_segmenter().measure([texts[idx] for idx in candidates])
+            oversized = {idx for idx, count in zip(candidates, counts) if count > limit}
+
+        pieces = []
+        owners = []
+        starts = []
+        for idx, text in enumerate(texts):
+            starts.append(len(pieces))
+            parts = self.get_segmenter().split(text) if idx in oversized else [text]
+            pieces.extend(parts)
+            owners.extend([idx] * len(parts))
+        starts.append(len(pieces))
+
+        if oversized:
+            self.logger.info(
+                f"{len(oversized)} segments au-delà de {limit} tokens découpés en phrases "
+                f"({len(pieces) - len(texts) + len(oversized)} morceaux)"
+            )
+        return pieces, owners, starts
+
+    def _get_translation_memory(self) -> Optional[TranslationMemory]:
+        """Ouvre la mémoire de traduction au premier usage (None si désactivée)."""
+        if not self.use_translation_memory:
+            return None
+        if self.translation_memory is None:
+            cache_dir = os.getenv('CACHE_DIR', './.model_cache')
+            self.translation_memory = TranslationMemory(
+                os.getenv('TRANSLATION_MEMORY_FILE', os.path.join(cache_dir, 'translation_memory.sqlite')),
+                lru_size=int(os.getenv('TRANSLATION_MEMORY_LRU_SIZE', 10000))
+            )
+        return self.translation_memory
+
+    def _get_output_length_model(self) -> OutputLengthModel:
+        """Rapports de longueur appris, chargés au premier usage."""
+        if self.output_lengths is None:
+            cache_dir = os.getenv('CACHE_DIR', './.model_cache')
+            self.output_lengths = OutputLengthModel(
+                os.getenv('OUTPUT_LENGTHS_FILE', os.path.join(cache_dir, 'output_lengths.json'))
+            )
+        return self.output_lengths
+
+    def _output_length_caps(self, source_tokens: list[int], rows: list[tuple], source_language: str,
+                            max_length: int) -> list[int]:
+        """
+        Nombre maximal de tokens produits pour chaque ligne (segment × langue cible).
+
+        La borne est proportionnelle à la longueur source : rapport appris pour la
+        paire de langues, sinon rapport du profil de décodage ou OUTPUT_LENGTH_RATIO,
+        plus une marge pour les segments très courts.
+        """
+        profile = DECODING_PROFILES.get(self.decoding_profile, {})
+        default_ratio = profile.get('length_ratio') or float(os.getenv('OUTPUT_LENGTH_RATIO', 3.0))
+        margin = profile.get('length_margin') or int(os.getenv('OUTPUT_LENGTH_MARGIN', 16))
+        model = self._get_output_length_model()
+
+        ratios = {}
+        caps = []
+        for idx, target in rows:
+            if target not in ratios:
+                ratios[target] = model.ratio(source_language, target) or default_ratio
+            caps.append(min(max_length, int(source_tokens[idx] * ratios[target]) + margin))
+        return caps
+
+    def _generation_parameters(self) -> dict:
+        """Paramètres de génération qui influencent le texte produit (clé de cache)."""
+        import torch
+
+        parameters = {'max_length': int(os.getenv('MAX_LENGTH', 1024))}
+        num_beams = self.num_beams
+        profile = DECODING_PROFILES.get(self.decoding_profile)
+        if profile:
+            parameters['profile'] = self.decoding_profile
+            if num_beams is None:
+                num_beams = profile['num_beams'] or int(os.getenv('NUM_BEAMS', 4))
+                if profile.get('assistant') and self.assistant_model is not None:
+                    # Le décodage assisté est glouton (même sortie que num_beams=1, en plus rapide)
+                    num_beams = 1
+        if num_beams:
+            parameters['num_beams'] = num_beams
+        if self.backend != 'torch':
+            parameters['backend'] = self.backend
+        if self.quantization and not torch.cuda.is_available():
+            parameters['quantization'] = self.quantization
+        if self._output_projection is not None:
+            parameters['vocabulary'] = 'pruned'
+        return parameters
+
+    def _lookup_translation_memory(
+        self,
+        texts: list[str],
+        target_language: str,
+        source_language: str,
+        translations: list
+    ) -> Optional[list[str]]:
+        """
+        Recherche tous les segments dans la mémoire de traduction en une passe.
+
+        Les traductions trouvées sont reportées dans `translations` et les compteurs
+        de succès/échecs sont ajoutés à cache_statistics.
+
+        Returns:
+            Liste des clés de cache par segment, ou None si la mémoire est désactivée
+        """
+        memory = self._get_translation_memory()
+        if memory is None:
+            return None
+
+        parameters = self._generation_parameters()
+        with telemetry.stage('memory'):
+            keys = [
+                TranslationMemory.make_key(self.model_name, source_language, target_language, parameters, text)
+                for text in texts
+            ]
+            cached = memory.get_many(keys)
 
+        hits = 0
+        for idx, key in enumerate(keys):
+            if key in cached:
+                translations[idx] = cached[key]
+                hits += 1
+
+        self.cache_statistics['hits'] = self.cache_statistics.get('hits', 0) + hits
+        self.cache_statistics['misses'] = self.cache_statistics.get('misses', 0) + len(texts) - hits
+        return keys
+
+    def _measure_token_lengths(self, texts: list[str], source_language: str = None) -> list[int]:
+        """Mesure la longueur en tokens de chaque segment (tokenisation groupée, sans padding)."""
+        with telemetry.stage('tokenize'), self._tokenizer_lock:
+            if source_language:
+                self.tokenizer.src_lang = source_language
+            encoded = self.tokenizer(
+                texts,
+                truncation=True,
+                max_length=int(os.getenv('MAX_LENGTH', 1024))
+            )
+        return [len(input_ids) for input_ids in encoded["input_ids"]]
+
+    def _translate_batch_resilient(
+        self,
+        texts: list[str],
+        targets: list[list[str]],
+        indices: list[int],
+        source_language: str,
+        on_error: Optional[Callable[[int, Exception], str]],
+        budget: Optional[AdaptiveBatchBudget] = None,
+        lengths: Optional[list[int]] = None
+    ) -> list[dict]:
+        """Traduit un lot et le redécoupe récursivement en cas d'échec."""
         try:
-            # Préfixe de langue pour NLLB
-            source_prefix = f"{source_language}>" if source_language else ""
+            results = self._generate_batch(texts, targets, source_language)
+        except Exception as error:
+            return self._recover_failed_batch(
+                error, texts, targets, indices, source_language, on_error, budget, lengths
+            )
+
+        self._record_batch_success(targets, indices, budget, lengths)
+        return results
+
+    def _recover_failed_batch(
+        self,
+        error: Exception,
+        texts: list[str],
+        targets: list[list[str]],
+        indices: list[int],
+        source_language: str,
+        on_error: Optional[Callable[[int, Exception], str]],
+        budget: Optional[AdaptiveBatchBudget],
+        lengths: Optional[list[int]]
+    ) -> list[dict]:
+        """Réduit le budget après une saturation mémoire puis retraduit le lot en deux moitiés."""
+        if self._is_out_of_memory(error):
+            # Seul chemin où le cache CUDA est vidé : avant de réessayer plus petit
+            self.release_memory()
+            if budget is not None:
+                cost = self._batch_cost(targets, indices, lengths)
+                previous = budget.current
+                budget.record_failure(cost)
+                self.batch_statistics['oom_retries'] = self.batch_statistics.get('oom_retries', 0) + 1
+                self.logger.warning(
+                    f"Saturation mémoire sur un lot de coût {cost}: budget {previous} -> {budget.current} "
+                    f"(plus grand lot réussi: {budget.largest_safe})"
+                )
+
+        if len(texts) == 1:
+            if on_error is None:
+                raise RuntimeError(f"Erreur de traduction: {str(error)}")
+            placeholder = on_error(indices[0], error)
+            return [{target: placeholder for target in targets[0]}]
+
+        middle = len(texts) // 2
+        return (
+            self._translate_batch_resilient(
+                texts[:middle], targets[:middle], indices[:middle], source_language, on_error, budget, lengths
+            )
+            + self._translate_batch_resilient(
+                texts[middle:], targets[middle:], indices[middle:], source_language, on_error, budget, lengths
+            )
+        )
+
+    def _record_batch_success(
+        self,
+        targets: list[list[str]],
+        indices: list[int],
+        budget: Optional[AdaptiveBatchBudget],
+        lengths: Optional[list[int]]
+    ) -> None:
+        if budget is None:
+            return
+        raised = budget.record_success(self._batch_cost(targets, indices, lengths))
+        if raised is not None:
+            self.logger.info(f"Budget de lot relevé à {raised} (limite {budget.limit})")
+
+    @staticmethod
+    def _batch_cost(targets: list[list[str]], indices: list[int], lengths: Optional[list[int]]) -> int:
+        """Coût d'un lot dans l'unité du budget : tokens après padding (× langues) ou segments."""
+        if lengths is not None:
+            return sum(len(row) for row in targets) * max(lengths[idx] for idx in indices)
+        return len(indices)
+
+    @staticmethod
+    def _is_out_of_memory(error: Exception) -> bool:
+        """Indique si une erreur correspond à un dépassement mémoire (CUDA ou CPU)."""
+        import torch
+
+        if isinstance(error, (MemoryError, torch.cuda.OutOfMemoryError)):
+            return True
+        message = str(error).lower()
+        # "can't allocate memory" : échec de l'allocateur CPU de torch (limite RSS d'un conteneur)
+        return "out of memory" in message or "can't allocate memory" in message
+
+    @staticmethod
+    def release_memory() -> None:
+        """Libère le cache de l'allocateur CUDA après une saturation mémoire."""
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    @staticmethod
+    def _forces_target_language(texts: list[str], rows: list[tuple], target_ids: dict) -> bool:
+        """
+        Lot à langue cible unique : la langue est forcée (forced_bos_token_id) et le décodeur
+        ne reçoit que le jeton de départ ; sinon il reçoit départ et langue de chaque ligne.
+        """
+        return len(target_ids) == 1 and len(rows) == len(texts)
+
+    def _generation_options(self, parameters: dict, caps: list[int], prefix_length: int = 2) -> dict:
+        """
+        Arguments de generate() pour un lot selon le profil de décodage.
+
+        Args:
+            parameters: Paramètres de génération (_generation_parameters)
+            caps: Nombre maximal de tokens produits par ligne (_output_length_caps)
+            prefix_length: Jetons fournis au décodeur avant génération (1 si la langue cible
+                est forcée, 2 si départ et langue sont donnés)
+
+        Returns:
+            dict: max_new_tokens, critère d'arrêt par ligne, num_beams, early_stopping, assistant_model
+        """
+        # Longueur totale de chaque ligne : jeton de départ, jeton de langue cible et tokens produits
+        limits = [cap + 2 for cap in caps]
+        max_new_tokens = max(limits) - prefix_length
+        if self._compiled:
+            # Taille du cache KV statique arrondie : un graphe par palier plutôt que par lot
+            max_new_tokens = -(-max_new_tokens // self.compile_bucket) * self.compile_bucket
+        # Longueur à laquelle generate() s'arrêterait sans critère
+        generated_limit = prefix_length + max_new_tokens
+        options = {'max_new_tokens': max_new_tokens, 'use_cache': True}
+        if 'num_beams' in parameters:
+            options['num_beams'] = parameters['num_beams']
+        greedy = options.get('num_beams', 1) == 1
+
+        profile = DECODING_PROFILES.get(parameters.get('profile'), {})
+        if profile.get('early_stopping') and not greedy:
+            options['early_stopping'] = os.getenv('EARLY_STOPPING', 'True').lower() in ('true', '1', 't')
+        if greedy and min(limits) < generated_limit:
+            # Chaque ligne s'arrête à sa propre borne ; le lot se termine quand toutes sont finies
+            options['stopping_criteria'] = _row_length_criteria(limits, self.device)
+        elif not greedy and max(limits) < generated_limit:
+            # En recherche en faisceau, seule la borne la plus haute du lot s'applique (arrondi du mode compilé)
+            options['stopping_criteria'] = _row_length_criteria([max(limits)], self.device)
+        if self.assistant_model is not None and len(caps) == 1 and greedy:
+            # Décodage assisté (un seul segment à la fois) : le brouillon propose, le modèle valide
+            options['assistant_model'] = self.assistant_model
+        return options
 
-            translations = self.translation_pipeline(
+    def _generate_batch(self, texts: list[str], targets: list[list[str]], source_language: str = None) -> list[dict]:
+        """
+        Encode, génère et décode un lot de segments.
+
+        Args:
+            texts: Segments du lot
+            targets: Langues cibles demandées pour chaque segment
+            source_language: Code langue source
+
+        Returns:
+            Pour chaque segment, un dictionnaire langue cible -> traduction
+        """
+        batch = self._encode_batch(texts, targets, source_language)
+        translated_tokens = self._generate_tokens(batch)
+        return self._decode_batch(batch, translated_tokens)
+
+    def _encode_batch(self, texts: list[str], targets: list[list[str]], source_language: str = None) -> dict:
+        """
+        Tokenise un lot et prépare les arguments de génération (étape CPU du pipeline).
+
+        Returns:
+            dict: Entrées tokenisées, lignes (segment, langue cible), bornes de sortie
+                et identifiants des jetons de langue cible
+        """
+        parameters = self._generation_parameters()
+        max_length = parameters['max_length']
+        with telemetry.stage('tokenize'), self._tokenizer_lock:
+            if source_language:
+                self.tokenizer.src_lang = source_language
+            input_tokens = self.tokenizer(
                 texts,
-                src_lang=source_prefix,
-                tgt_lang=target_language,
-                batch_size=int(os.getenv('BATCH_SIZE', 8)),
-                num_beams=int(os.getenv('NUM_BEAMS', 2)),
-                early_stopping=True,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                pad_to_multiple_of=self.compile_bucket if self._compiled else None
+            ).to(self.device)
+            rows = [(idx, target) for idx, row in enumerate(targets) for target in row]
+            target_ids = {target: self.tokenizer.convert_tokens_to_ids(target) for _, target in rows}
+
+        # Tokens source hors jeton de langue et fin de séquence
+        source_tokens = (input_tokens["attention_mask"].sum(dim=1) - 2).tolist()
+        caps = self._output_length_caps(source_tokens, rows, source_language, max_length)
+        return {
+            'texts': texts,
+            'source_language': source_language,
+            'input_tokens': input_tokens,
+            'rows': rows,
+            'target_ids': target_ids,
+            'source_tokens': source_tokens,
+            'caps': caps,
+            'generation_options': self._generation_options(
+                parameters, caps, 1 if self._forces_target_language(texts, rows, target_ids) else 2
+            ),
+            'vocabulary': self._vocabulary_subset(input_tokens, target_ids),
+        }
+
+    def _vocabulary_subset(self, input_tokens, target_ids: dict) -> Optional[tuple]:
+        """
+        Parties de la projection de sortie à calculer pour un lot.
+
+        Returns:
+            tuple: Lignes du vocabulaire des langues cibles (mises en cache par combinaison
+                de langues) et lignes des tokens source absents de ce vocabulaire (noms propres,
+                nombres recopiés), ou None pour la projection complète (vocabulaire réduit
+                désactivé, ou langue cible sans vocabulaire construit)
+        """
+        import torch
+
+        if self._output_projection is None:
+            return None
+
+        key = tuple(sorted(target_ids))
+        if key not in self._vocabulary_subsets:
+            vocabularies = [self.vocabularies.load(target) for target in key]
+            if any(ids is None for ids in vocabularies):
+                missing = [target for target, ids in zip(key, vocabularies) if ids is None]
+                self.logger.warning(
+                    f"Pas de vocabulaire réduit pour {', '.join(missing)}: projection complète "
+                    f"(uv run -m app.vocabulary -l {missing[0]} corpus.txt)"
+                )
+                self._vocabulary_subsets[key] = None
+            else:
+                ids = set(target_ids.values())
+                ids.update(self.tokenizer.all_special_ids)
+                for vocabulary in vocabularies:
+                    ids.update(vocabulary)
+                with torch.inference_mode():
+                    self._vocabulary_subsets[key] = self._output_projection.select(
+                        torch.tensor(sorted(ids), device=self.device)
+                    )
+        base = self._vocabulary_subsets[key]
+        if base is None:
+            return None
+
+        source_ids = torch.unique(input_tokens['input_ids'])
+        extra = source_ids[~torch.isin(source_ids, base[0])]
+        if not len(extra):
+            return (base,)
+        with torch.inference_mode():
+            return (base, self._output_projection.select(extra))
+
+    def _generate_tokens(self, batch: dict):
+        """
+        Génère les séquences de sortie d'un lot encodé (étape modèle du pipeline).
+
+        Avec un vocabulaire réduit, les lignes arrêtées sans fin de séquence avant leur borne
+        de longueur, ou contenant un token hors du sous-ensemble, sont régénérées seules avec
+        la projection complète. Une ligne arrêtée par sa borne ne relève pas du vocabulaire :
+        elle est signalée comme les autres par _check_output_lengths.
+        """
+        subset = batch.get('vocabulary')
+        if subset is None:
+            return self._generate_with_projection(batch)
+
+        self._output_projection.restrict(*subset)
+        try:
+            translated_tokens = self._generate_with_projection(batch)
+        finally:
+            self._output_projection.restrict()
+
+        import torch
+
+        generated = translated_tokens[:, 2:]
+        finished = (generated == self.tokenizer.eos_token_id).any(dim=1).tolist()
+        produced = (generated != self.tokenizer.pad_token_id).sum(dim=1).tolist()
+        allowed = torch.cat([ids for ids, _, _ in subset])
+        outside = (~torch.isin(generated, allowed)).any(dim=1).tolist()
+        positions = [
+            position
+            for position, (done, length, cap, escaped) in enumerate(zip(finished, produced, batch['caps'], outside))
+            if escaped or (not done and length < cap)
+        ]
+        if not positions:
+            return translated_tokens
+        self.logger.debug(f"{len(positions)} lignes régénérées avec le vocabulaire complet")
+        self.batch_statistics['vocabulary_fallbacks'] = (
+            self.batch_statistics.get('vocabulary_fallbacks', 0) + len(positions)
+        )
+        telemetry.count('vocabulary_fallbacks', len(positions))
+        return self._regenerate_rows(batch, translated_tokens, positions)
+
+    def _regenerate_rows(self, batch: dict, translated_tokens, positions: list[int]):
+        """Régénère les lignes `positions` d'un lot (projection courante) et les remplace dans la sortie."""
+        import torch
+
+        rows = [batch['rows'][position] for position in positions]
+        text_indices = sorted({idx for idx, _ in rows})
+        remap = {idx: new_idx for new_idx, idx in enumerate(text_indices)}
+        index = torch.tensor(text_indices, device=self.device)
+        caps = [batch['caps'][position] for position in positions]
+        texts = [batch['texts'][idx] for idx in text_indices]
+        rows = [(remap[idx], target) for idx, target in rows]
+        target_ids = {target: batch['target_ids'][target] for _, target in rows}
+        regenerated = self._generate_with_projection(dict(
+            batch,
+            texts=texts,
+            input_tokens={name: tensor.index_select(0, index) for name, tensor in batch['input_tokens'].items()},
+            rows=rows,
+            target_ids=target_ids,
+            caps=caps,
+            generation_options=self._generation_options(
+                self._generation_parameters(), caps,
+                1 if self._forces_target_language(texts, rows, target_ids) else 2
+            ),
+        ))
+
+        # Les deux sorties sont complétées au padding jusqu'à la même longueur
+        width = max(translated_tokens.shape[-1], regenerated.shape[-1])
+        pad_token_id = self.tokenizer.pad_token_id
+        merged = torch.nn.functional.pad(
+            translated_tokens, (0, width - translated_tokens.shape[-1]), value=pad_token_id
+        )
+        merged[torch.tensor(positions, device=merged.device)] = torch.nn.functional.pad(
+            regenerated, (0, width - regenerated.shape[-1]), value=pad_token_id
+        )
+        return merged
+
+    def _generate_with_projection(self, batch: dict):
+        """Appelle generate sur un lot encodé avec la projection de sortie courante."""
+        import torch
+        from transformers.modeling_outputs import BaseModelOutput
+
+        input_tokens = batch['input_tokens']
+        rows = batch['rows']
+        with telemetry.stage('generate'), torch.inference_mode():
+            if self._forces_target_language(batch['texts'], rows, batch['target_ids']):
+                return self.translation_model.generate(
+                    **input_tokens,
+                    forced_bos_token_id=batch['target_ids'][rows[0][1]],
+                    **batch['generation_options']
+                )
+
+            # Encodeur exécuté une seule fois ; seul le jeton de langue du décodeur diffère
+            encoder_outputs = self.translation_model.get_encoder()(**input_tokens)
+            row_index = torch.tensor([idx for idx, _ in rows], device=self.device)
+            decoder_start = self.translation_model.config.decoder_start_token_id
+            decoder_input_ids = torch.tensor(
+                [[decoder_start, batch['target_ids'][target]] for _, target in rows],
+                device=self.device
+            )
+            return self.translation_model.generate(
+                encoder_outputs=BaseModelOutput(
+                    last_hidden_state=encoder_outputs.last_hidden_state.index_select(0, row_index)
+                ),
+                attention_mask=input_tokens["attention_mask"].index_select(0, row_index),
+                decoder_input_ids=decoder_input_ids,
+                **batch['generation_options']
+            )
+
+    def _decode_batch(self, batch: dict, translated_tokens) -> list[dict]:
+        """Décode les séquences générées d'un lot (étape CPU du pipeline)."""
+        texts = batch['texts']
+        with telemetry.stage('decode'), self._tokenizer_lock:
+            decoded = self.tokenizer.batch_decode(
+                translated_tokens,
+                skip_special_tokens=True,
                 clean_up_tokenization_spaces=True
             )
-            
-            return [result['translation_text'] for result in translations]
-            
-        except Exception as error:
-            raise RuntimeError(f"Erreur de traduction: {str(error)}")
+
+        if not self._warming_up:
+            capped = self._check_output_lengths(
+                texts, batch['rows'], translated_tokens,
+                batch['source_tokens'], batch['caps'], batch['source_language']
+            )
+            self.capped_outputs.update((texts[idx], target) for idx, target in capped)
+
+        if telemetry.enabled:
+            attention_mask = batch['input_tokens']["attention_mask"]
+            telemetry.count('batches')
+            telemetry.count('segments', len(texts))
+            telemetry.count('tokens_in', int(attention_mask.sum()))
+            telemetry.count('padded_tokens', attention_mask.numel())
+            telemetry.count('tokens_out', int((translated_tokens != self.tokenizer.pad_token_id).sum()))
+
+        results = [{} for _ in texts]
+        for (idx, target), translated in zip(batch['rows'], decoded):
+            results[idx][target] = translated
+        return results
+
+    def _check_output_lengths(self, texts: list[str], rows: list[tuple], translated_tokens,
+                              source_tokens: list[int], caps: list[int], source_language: str) -> list[tuple]:
+        """
+        Apprend les rapports de longueur des traductions terminées et signale les lignes
+        arrêtées par leur borne (sans fin de séquence) : boucle de répétition probable.
+
+        Returns:
+            list: Lignes (index du segment, langue cible) arrêtées par leur borne
+        """
+        # Les deux premiers jetons (départ, langue) ne comptent pas ; le départ est aussi la fin de séquence
+        generated = translated_tokens[:, 2:]
+        finished = (generated == self.tokenizer.eos_token_id).any(dim=1).tolist()
+        produced = (generated != self.tokenizer.pad_token_id).sum(dim=1).tolist()
+        model = self._get_output_length_model()
+
+        capped = []
+        for (idx, target), done, length, cap in zip(rows, finished, produced, caps):
+            if done:
+                model.observe(source_language, target, source_tokens[idx], length - 1)
+                continue
+            capped.append((idx, target))
+            self.logger.warning(
+                f"Traduction arrêtée à {cap} tokens pour {source_tokens[idx]} tokens source "
+                f"({target}), hallucination probable: {texts[idx][:80]!r}"
+            )
+
+        if capped:
+            self.batch_statistics['length_capped'] = self.batch_statistics.get('length_capped', 0) + len(capped)
+            telemetry.count('length_capped', len(capped))
+        return capped
 
     def get_supported_languages(self) -> dict:
         """Retourne la liste des langues supportées avec leurs codes."""
@@ -163,7 +1613,7 @@ class NLLBTranslationService:
 
     def translate_text(self, text: str, target_language: str, source_language: str = None) -> str:
         """
-        Traduit un texte unique avec gestion explicite du device (GPU/CPU).
+        Traduit un texte unique sur le device choisi au chargement du modèle.
         
         Args:
             text: Texte à traduire
@@ -176,35 +1626,33 @@ class NLLBTranslationService:
         Raises:
             RuntimeError: Si la traduction échoue
         """
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-        if not self._is_model_loaded:
-            self.initialize_translation_model()
+        if source_language is None:
+            source_language = self.detect_source_languages([text])[0]
+            if source_language is None:
+                raise RuntimeError("Langue source non détectée (préciser -s/--source-language)")
 
-        try:
-            # Sélection du device (GPU si disponible)
-            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.translation_model.to(device)
+        if len(text) > self._max_input_tokens():
+            # Texte potentiellement trop long pour un seul passage : découpe en phrases si besoin
+            return self.translate_batch([text], target_language, source_language)[0]
 
-            if source_language:
-                self.tokenizer.src_lang = source_language
+        self.cache_statistics = {}
+        self.capped_outputs = set()
+        cached = [None]
+        keys = self._lookup_translation_memory([text], target_language, source_language, cached)
+        if cached[0] is not None:
+            return cached[0]
 
-            # Tokenization sur le bon device
-            input_tokens = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=int(os.getenv('MAX_LENGTH', 1024))
-            ).to(device)
+        if not self._is_model_loaded:
+            self.initialize_translation_model()
 
-            # Génération de la traduction
-            translated_tokens = self.translation_model.generate(
-                **input_tokens,
-                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids([target_language]),
-                max_length=int(os.getenv('MAX_LENGTH', 1024))
-            )
+        try:
+            # Lot d'un seul segment : même chemin que translate_batch, sans planification
+            translated = self._generate_batch([text], [[target_language]], source_language)[0][target_language]
 
-            return self.tokenizer.decode(translated_tokens[0], skip_special_tokens=True, clean_up_tokenization_spaces=True)
+            if keys and not self.capped_outputs:
+                self._get_translation_memory().put_many({keys[0]: translated})
+            self.output_lengths.save()
+            return translated
 
         except Exception as error:
             raise RuntimeError(f"Erreur de traduction: {str(error)}")
\ No newline at end of file
@@ -1,6 +1,11 @@
+import queue
+import re
 import sys
+import threading
 import time
-from typing import List
+from typing import Callable, Iterable, Iterator, List
+
+from .telemetry import telemetry
 
 class ProgressVisualizer:
     """Gestion simplifiée de la progression"""
@@ -20,35 +25,285 @@ class ProgressVisualizer:
         )
         sys.stdout.flush()
 
+class Prefetcher:
+    """
+    Itère sur un itérable calculé à l'avance dans un thread (au plus `depth` éléments d'avance).
+
+    Sert à lire et segmenter la fenêtre suivante d'un document pendant la traduction
+    de la fenêtre courante. Les exceptions du thread sont relancées à l'itération.
+    """
+
+    _END = object()
+
+    def __init__(self, iterable: Iterable, depth: int = 1):
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, args=(iterable,), name='l2t-prefetch', daemon=True)
+        self._thread.start()
+
+    def _produce(self, iterable: Iterable) -> None:
+        try:
+            for item in iterable:
+                if not self._put((item, None)):
+                    return
+        except Exception as error:
+            self._put((self._END, error))
+            return
+        self._put((self._END, None))
+
+    def _put(self, entry: tuple) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator:
+        try:
+            while True:
+                telemetry.gauge('queue_prefetch', self._queue.qsize())
+                item, error = self._queue.get()
+                if error is not None:
+                    raise error
+                if item is self._END:
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Arrête la lecture anticipée (fin de traduction ou abandon)."""
+        self._stop.set()
+
+
 class TextSegmenter:
+    # Ligne de saut de page (cf. file_handlers.PAGE_BREAK), conservée telle quelle
+    PAGE_BREAK = "\f"
+
     @staticmethod
     def split_paragraphs(text: str, min_chunk=3) -> List[str]:
         """Regroupe les petits paragraphes pour maintenir le contexte"""
-        lines = text.split('\n')
-        chunks = []
+        return list(TextSegmenter.iter_paragraphs(text.split('\n'), min_chunk))
+
+    @staticmethod
+    def iter_paragraphs(lines: Iterable[str], min_chunk=3) -> Iterator[str]:
+        """Version génératrice de split_paragraphs, alimentée ligne à ligne"""
         current_chunk = []
         
         for line in lines:
             stripped = line.strip()
             if not stripped:
                 if current_chunk:
-                    chunks.append('\n'.join(current_chunk))
+                    yield '\n'.join(current_chunk)
                     current_chunk = []
-                chunks.append("")  # Préserve les sauts de ligne
+                # Préserve les sauts de ligne (et de page)
+                yield TextSegmenter.PAGE_BREAK if line == TextSegmenter.PAGE_BREAK else ""
             else:
                 current_chunk.append(line)
                 # Force un nouveau chunk après min_chunk lignes non vides
                 if len(current_chunk) >= min_chunk:
-                    chunks.append('\n'.join(current_chunk))
+                    yield '\n'.join(current_chunk)
                     current_chunk = []
         
         if current_chunk:
-            chunks.append('\n'.join(current_chunk))
-            
-        return chunks
+            yield '\n'.join(current_chunk)
 
         @staticmethod
         def split_into_segments(text: str, chunk_size: int) -> List[str]:
             """Découpe en segments de taille fixe en respectant les sauts de ligne"""
             # Implémentation inchangée mais à utiliser avec précaution
-            return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
\ No newline at end of file
+            return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+class TokenAwareSegmenter:
+    """
+    Segmentation par phrases sous la limite de tokens du modèle.
+
+    Les lignes d'un paragraphe sont regroupées en unités qui se terminent sur une
+    fin de phrase (une ligne coupée au milieu d'une phrase reste avec la suivante),
+    puis les unités consécutives d'un même paragraphe sont assemblées jusqu'à
+    target_tokens. Les lignes vides et les sauts de page sont restitués à leur
+    place, comme avec TextSegmenter.iter_paragraphs : chaque segment produit
+    couvre des lignes entières et consécutives du document.
+
+    Les longueurs sont mesurées avec le tokenizer du modèle (count_tokens), par
+    lots de plusieurs milliers d'unités et avec un cache des textes déjà mesurés.
+    """
+
+    # Ligne terminant une phrase (ponctuation finale, éventuellement suivie d'un guillemet)
+    LINE_END = re.compile(r'[.!?…:;]\s?["»”\')\]]*\s*$')
+    # Phrase : jusqu'à une ponctuation finale suivie d'un espace, ou jusqu'à la fin du texte
+    SENTENCE = re.compile(r'\S.*?(?:[.!?…]+(?:[\s\u00a0]?["»”\')\]])*(?=\s|$)|$)', re.S)
+
+    def __init__(
+        self,
+        count_tokens: Callable[[List[str]], List[int]],
+        target_tokens: int = 200,
+        max_tokens: int = 500,
+        batch_units: int = 4096,
+        cache_size: int = 100000
+    ):
+        """
+        Args:
+            count_tokens: Mesure groupée (tokens hors tokens spéciaux) d'une liste de textes
+            target_tokens: Taille visée d'un segment assemblé
+            max_tokens: Limite du modèle ; un segment plus long doit être découpé (split)
+            batch_units: Nombre d'unités mesurées ensemble
+            cache_size: Nombre de longueurs gardées en cache
+        """
+        self.count_tokens = count_tokens
+        self.max_tokens = max(1, max_tokens)
+        self.target_tokens = max(1, min(target_tokens, self.max_tokens))
+        self.batch_units = max(1, batch_units)
+        self.cache_size = cache_size
+        # Une unité sans fin de phrase est close au-delà de cette taille (≥ 1 caractère par token)
+        self.max_unit_chars = 4 * self.target_tokens
+        self._cache = {}
+        # measure est appelé depuis la lecture anticipée (Prefetcher) et depuis le thread principal
+        self._cache_lock = threading.Lock()
+
+    def split_paragraphs(self, text: str) -> List[str]:
+        """Segmente un texte complet (voir iter_segments)."""
+        return list(self.iter_segments(text.split('\n')))
+
+    def iter_segments(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Version génératrice, alimentée ligne à ligne (mêmes conventions que
+        TextSegmenter.iter_paragraphs : "" pour une ligne vide, PAGE_BREAK pour un saut de page).
+        """
+        buffered = []
+        buffered_units = 0
+
+        for item in self._iter_blocks(lines):
+            buffered.append(item)
+            if isinstance(item, list):
+                buffered_units += len(item)
+            if buffered_units >= self.batch_units:
+                yield from self._flush(buffered)
+                buffered = []
+                buffered_units = 0
+
+        yield from self._flush(buffered)
+
+    def split(self, text: str) -> List[str]:
+        """
+        Découpe un segment trop long en morceaux d'au plus max_tokens, sur les fins de phrase.
+
+        Les phrases sont réassemblées jusqu'à target_tokens ; une phrase qui dépasse
+        à elle seule la limite est coupée entre deux mots.
+        """
+        sentences = self.SENTENCE.findall(text)
+        pieces = []
+        for sentence, count in zip(sentences, self.measure(sentences)):
+            if count > self.max_tokens:
+                pieces.extend(self._split_words(sentence))
+            else:
+                pieces.append((sentence, count))
+
+        return [" ".join(group) for group in self._pack(pieces)] or [text]
+
+    def measure(self, texts: List[str]) -> List[int]:
+        """Longueur en tokens de chaque texte (mesure groupée des textes absents du cache)."""
+        unique = dict.fromkeys(texts)
+        with self._cache_lock:
+            lengths = {text: self._cache[text] for text in unique if text in self._cache}
+        # Mesure hors verrou : le résultat ne relit jamais le cache partagé
+        missing = [text for text in unique if text not in lengths]
+        counts = dict(zip(missing, self.count_tokens(missing))) if missing else {}
+        lengths.update(counts)
+
+        with self._cache_lock:
+            if len(self._cache) + len(counts) > self.cache_size:
+                self._cache.clear()
+            self._cache.update(counts)
+        return [lengths[text] for text in texts]
+
+    def _iter_blocks(self, lines: Iterable[str]) -> Iterator:
+        """Produit les sauts ("" ou PAGE_BREAK) et les paragraphes (listes d'unités)."""
+        units = []
+        current = []
+        current_chars = 0
+
+        for line in lines:
+            if not line.strip():
+                if current:
+                    units.append('\n'.join(current))
+                    current = []
+                    current_chars = 0
+                if units:
+                    yield units
+                    units = []
+                yield TextSegmenter.PAGE_BREAK if line == TextSegmenter.PAGE_BREAK else ""
+                continue
+
+            current.append(line)
+            current_chars += len(line)
+            if current_chars >= self.max_unit_chars or self.LINE_END.search(line):
+                units.append('\n'.join(current))
+                current = []
+                current_chars = 0
+                if len(units) >= self.batch_units:
+                    # Paragraphe démesuré : livré en plusieurs parties
+                    yield units
+                    units = []
+
+        if current:
+            units.append('\n'.join(current))
+        if units:
+            yield units
+
+    def _flush(self, items: list) -> Iterator[str]:
+        """Mesure toutes les unités en attente en un lot puis assemble les segments."""
+        with telemetry.stage('segment'):
+            counts = iter(self.measure([unit for item in items if isinstance(item, list) for unit in item]))
+        for item in items:
+            if isinstance(item, str):
+                yield item
+                continue
+            for group in self._pack([(unit, next(counts)) for unit in item]):
+                yield '\n'.join(group)
+
+    def _pack(self, units: list) -> Iterator[List[str]]:
+        """Assemble des (texte, longueur) consécutifs jusqu'à target_tokens."""
+        group = []
+        total = 0
+        for unit, count in units:
+            if group and total + count > self.target_tokens:
+                yield group
+                group = []
+                total = 0
+            group.append(unit)
+            total += count
+        if group:
+            yield group
+
+    def _split_words(self, sentence: str) -> list:
+        """Coupe une phrase trop longue entre deux mots, sous max_tokens par morceau."""
+        words = sentence.split()
+        pieces = []
+        current = []
+        total = 0
+        for word, count in zip(words, self.measure(words)):
+            if count > self.max_tokens:
+                # Mot démesuré (URL, suite de symboles) : au plus un token par caractère
+                if current:
+                    pieces.append((" ".join(current), total))
+                    current = []
+                    total = 0
+                pieces.extend(
+                    (word[start:start + self.max_tokens], self.max_tokens)
+                    for start in range(0, len(word), self.max_tokens)
+                )
+                continue
+            if current and total + count > self.max_tokens:
+                pieces.append((" ".join(current), total))
+                current = []
+                total = 0
+            current.append(word)
+            total += count
+        if current:
+            pieces.append((" ".join(current), total))
+        return pieces
+
@@ -0,0 +1,117 @@
+"""
+Vocabulaires réduits par langue cible pour la projection de sortie du modèle.
+
+Construction depuis des corpus de référence dans la langue cible :
+    uv run -m app.vocabulary -l fra_Latn corpus/*.txt
+"""
+import argparse
+import glob
+import os
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+
+class TargetVocabulary:
+    """
+    Sous-ensembles de tokens par langue cible, stockés en tableaux d'indices int32.
+
+    Un fichier par langue ({langue}.bin dans VOCABULARY_DIR) contient les identifiants
+    triés des tokens observés dans les corpus de référence de cette langue. Les
+    tokens spéciaux et les codes de langue sont toujours inclus.
+    """
+
+    SUFFIX = '.bin'
+
+    def __init__(self, directory: Union[str, Path, None] = None):
+        self.directory = Path(directory or os.getenv(
+            'VOCABULARY_DIR', os.path.join(os.getenv('CACHE_DIR', './.model_cache'), 'vocabulary')
+        ))
+        self._loaded = {}
+
+    def path(self, language: str) -> Path:
+        return self.directory / f"{language}{self.SUFFIX}"
+
+    def load(self, language: str) -> Optional[array]:
+        """Identifiants du vocabulaire d'une langue (None si aucun vocabulaire n'a été construit)."""
+        if language not in self._loaded:
+            path = self.path(language)
+            ids = None
+            if path.exists():
+                ids = array('i')
+                ids.frombytes(path.read_bytes())
+            self._loaded[language] = ids
+        return self._loaded[language]
+
+    def save(self, language: str, ids: Iterable[int]) -> Path:
+        """Enregistre le vocabulaire d'une langue (écriture atomique)."""
+        path = self.path(language)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(path.name + '.tmp')
+        temporary_path.write_bytes(array('i', sorted(set(ids))).tobytes())
+        temporary_path.replace(path)
+        self._loaded.pop(language, None)
+        return path
+
+    @staticmethod
+    def build(tokenizer, texts: Iterable[str], min_count: int = 1, chunk_size: int = 256) -> list[int]:
+        """
+        Tokens observés au moins `min_count` fois dans les textes, plus les tokens spéciaux.
+
+        Args:
+            tokenizer: Tokenizer du modèle
+            texts: Textes de référence dans la langue cible
+            min_count: Nombre minimal d'occurrences d'un token
+            chunk_size: Textes tokenisés par appel
+        """
+        counts = Counter()
+        chunk = []
+        for text in texts:
+            if text.strip():
+                chunk.append(text)
+            if len(chunk) >= chunk_size:
+                for input_ids in tokenizer(chunk, add_special_tokens=False)["input_ids"]:
+                    counts.update(input_ids)
+                chunk = []
+        if chunk:
+            for input_ids in tokenizer(chunk, add_special_tokens=False)["input_ids"]:
+                counts.update(input_ids)
+
+        ids = {token for token, count in counts.items() if count >= min_count}
+        ids.update(tokenizer.all_special_ids)
+        return sorted(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit le vocabulaire réduit d'une langue cible")
+    parser.add_argument('-l', '--language', required=True, help="Code de la langue cible (ex: fra_Latn)")
+    parser.add_argument('corpus', nargs='+', help="Fichiers texte de référence (motifs glob acceptés)")
+    parser.add_argument('--min-count', type=int, default=1, help="Occurrences minimales d'un token")
+    parser.add_argument('--encoding', default='utf-8')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from transformers import AutoTokenizer
+
+    load_dotenv()
+    tokenizer = AutoTokenizer.from_pretrained(
+        os.getenv('MODEL_NAME', "facebook/nllb-200-distilled-600M"), use_fast=True
+    )
+
+    paths = sorted({path for pattern in args.corpus for path in glob.glob(pattern, recursive=True)})
+    if not paths:
+        raise SystemExit("Aucun fichier de corpus trouvé")
+
+    def iter_lines():
+        for path in paths:
+            with open(path, 'r', encoding=args.encoding, errors='replace') as f:
+                yield from f
+
+    ids = TargetVocabulary.build(tokenizer, iter_lines(), min_count=args.min_count)
+    path = TargetVocabulary().save(args.language, ids)
+    print(f"{len(ids)} tokens sur {len(tokenizer)} ({len(ids) / len(tokenizer):.1%}) -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import os
+import queue
+from typing import Callable, Optional
+
+import torch
+import torch.multiprocessing as mp
+
+from .telemetry import telemetry
+from .translator import NLLBTranslationService
+
+# Délai d'attente d'un résultat avant de vérifier que les workers sont vivants (secondes)
+_POLL_INTERVAL = 1.0
+
+
+def _worker_main(
+    worker_id: int,
+    model: torch.nn.Module,
+    model_name: str,
+    settings: dict,
+    num_threads: int,
+    collect_metrics: bool,
+    tasks,
+    results
+) -> None:
+    """
+    Boucle d'un processus worker : traduit les tranches de segments reçues.
+
+    Les poids du modèle arrivent par mémoire partagée (aucune copie par worker) ;
+    seul le tokenizer est rechargé depuis le cache local. `settings` reporte les
+    réglages de génération du service principal (quantification, beams...).
+    """
+    from transformers import AutoTokenizer
+
+    torch.set_num_threads(num_threads)
+    if collect_metrics:
+        telemetry.enable()
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.model_name = model_name
+    for name, value in settings.items():
+        setattr(service, name, value)
+    service.translation_model = model
+    service.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    service.device = model.device
+    service._is_model_loaded = True
+    if service.vocabulary_pruning:
+        # La projection remplacée dans le processus principal arrive avec le modèle : elle est reprise
+        service._install_output_projection()
+    results.put(('ready', worker_id, None, None, None, None, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        shard_id, texts, targets, source_language, batch_size, max_batch_tokens = task
+        errors = {}
+        # Mesures propres à la tranche, cumulées par le processus principal
+        telemetry.reset()
+        service.capped_outputs = set()
+
+        def record_error(idx: int, error: Exception) -> str:
+            errors[idx] = str(error)
+            return ""
+
+        rows = [None] * len(texts)
+        try:
+            for positions, batch_rows in service._run_scheduled_batches(
+                texts, targets, source_language, batch_size, max_batch_tokens, record_error
+            ):
+                for position, row in zip(positions, batch_rows):
+                    rows[position] = row
+        except Exception as error:
+            # Erreur hors segment (tokenizer, etc.) : toute la tranche est en échec
+            errors = {idx: str(error) for idx in range(len(texts))}
+            rows = [{target: "" for target in row_targets} for row_targets in targets]
+
+        results.put((
+            'done', shard_id, rows, errors, service.batch_statistics, telemetry.snapshot(),
+            list(service.capped_outputs)
+        ))
+
+
+class WorkerPoolTranslationService(NLLBTranslationService):
+    """
+    Service de traduction CPU réparti sur plusieurs processus.
+
+    Le modèle est chargé une fois dans le processus principal, ses poids sont
+    placés en mémoire partagée puis transmis aux N workers : la RAM consommée
+    reste celle d'un seul modèle. Les segments à traduire sont découpés en
+    tranches contiguës réparties entre les workers et réassemblés dans l'ordre.
+    La mémoire de traduction et le dédoublonnage restent dans le processus principal.
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        shard_size: Optional[int] = None
+    ):
+        super().__init__()
+        cpu_count = os.cpu_count() or 1
+        self.num_workers = max(1, num_workers or int(os.getenv('WORKER_PROCESSES', 0)) or cpu_count)
+        self.threads_per_worker = max(
+            1,
+            threads_per_worker or int(os.getenv('THREADS_PER_WORKER', 0)) or cpu_count // self.num_workers
+        )
+        self.shard_size = max(1, shard_size or int(os.getenv('WORKER_SHARD_SIZE', 64)))
+        self._processes = []
+        self._tasks = None
+        self._results = None
+        self._job_counter = 0
+
+    def initialize_translation_model(self):
+        """
+        Charge le modèle puis démarre les workers qui en partagent les poids.
+
+        Raises:
+            RuntimeError: Si le chargement du modèle ou le démarrage des workers échoue
+        """
+        if self._is_model_loaded:
+            return
+
+        if self.compile_model:
+            # Le forward compilé du processus principal ne peut pas être transmis aux workers
+            self.logger.warning("Compilation ignorée avec le pool de workers")
+            self.compile_model = False
+
+        super().initialize_translation_model()
+
+        if self.backend != 'torch':
+            # ONNX Runtime répartit déjà le calcul sur ses propres threads (ORT_*_OP_THREADS)
+            self.logger.warning(
+                f"Pool de workers réservé au backend torch ({self.backend}), traduction dans le processus principal"
+            )
+            return
+
+        if self.device.type != 'cpu':
+            self.logger.warning("Pool de workers réservé à l'inférence CPU, traduction dans le processus principal")
+            return
+
+        if self.quantization:
+            # Les poids int8 compactés ne sont pas des tenseurs partageables : copie par worker
+            self.logger.warning("Modèle quantifié: les poids sont copiés dans chaque worker")
+        else:
+            self.translation_model.share_memory()
+
+        try:
+            context = mp.get_context('spawn')
+            self._tasks = context.Queue()
+            self._results = context.Queue()
+            for worker_id in range(self.num_workers):
+                process = context.Process(
+                    target=_worker_main,
+                    args=(
+                        worker_id,
+                        self.translation_model,
+                        self.model_name,
+                        self._worker_settings(),
+                        self.threads_per_worker,
+                        telemetry.enabled,
+                        self._tasks,
+                        self._results
+                    ),
+                    daemon=True
+                )
+                process.start()
+                self._processes.append(process)
+
+            for _ in self._processes:
+                self._next_result()
+        except Exception as error:
+            self.close()
+            raise RuntimeError(f"Erreur lors du démarrage des workers: {str(error)}")
+
+        self.logger.info(
+            f"Pool de traduction: {self.num_workers} workers × {self.threads_per_worker} threads"
+        )
+
+    def _worker_settings(self) -> dict:
+        """Réglages du service recopiés dans chaque worker."""
+        return {
+            'quantization': self.quantization,
+            'num_beams': self.num_beams,
+            'decoding_profile': self.decoding_profile,
+            'compile_model': self.compile_model,
+            'vocabulary_pruning': self._output_projection is not None,
+        }
+
+    def close(self) -> None:
+        """Arrête les workers (le modèle du processus principal reste chargé)."""
+        for _ in self._processes:
+            if self._tasks is not None:
+                self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self) -> "WorkerPoolTranslationService":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _run_scheduled_batches(
+        self,
+        texts: list[str],
+        targets: list[list[str]],
+        source_language: str,
+        batch_size: Optional[int],
+        max_batch_tokens: Optional[int],
+        on_error: Optional[Callable[[int, Exception], str]]
+    ):
+        """Répartit les segments en tranches entre les workers (générateur de (indices, traductions))."""
+        if not self._processes:
+            yield from super()._run_scheduled_batches(
+                texts, targets, source_language, batch_size, max_batch_tokens, on_error
+            )
+            return
+
+        # Au moins une tranche par worker, sans dépasser shard_size segments
+        shard_size = min(self.shard_size, -(-len(texts) // self.num_workers))
+        offsets = list(range(0, len(texts), shard_size))
+        # Identifiant de travail : écarte les résultats d'un appel précédent interrompu
+        self._job_counter += 1
+        for shard_id, start in enumerate(offsets):
+            self._tasks.put((
+                (self._job_counter, shard_id),
+                texts[start:start + shard_size],
+                targets[start:start + shard_size],
+                source_language,
+                batch_size,
+                max_batch_tokens
+            ))
+
+        self.batch_statistics = {}
+        remaining = len(offsets)
+        while remaining:
+            _, (job_id, shard_id), rows, errors, statistics, metrics, capped = self._next_result()
+            if job_id != self._job_counter:
+                continue
+            remaining -= 1
+            start = offsets[shard_id]
+            self._merge_batch_statistics(statistics)
+            telemetry.merge(metrics)
+            self.capped_outputs.update(capped)
+
+            for idx, message in errors.items():
+                if on_error is None:
+                    raise RuntimeError(f"Erreur de traduction: {message}")
+                placeholder = on_error(start + idx, RuntimeError(message))
+                rows[idx] = {target: placeholder for target in targets[start + idx]}
+
+            yield list(range(start, start + len(rows))), rows
+
+    def _next_result(self) -> tuple:
+        """Attend le prochain message d'un worker en détectant un worker arrêté."""
+        while True:
+            try:
+                return self._results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                dead = [process for process in self._processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Worker de traduction arrêté (code {dead[0].exitcode})")
+
+    def _merge_batch_statistics(self, statistics: dict) -> None:
+        """Cumule les statistiques de lots d'une tranche."""
+        for name, value in statistics.items():
+            if name != 'padding_ratio':
+                self.batch_statistics[name] = self.batch_statistics.get(name, 0) + value
+        if self.batch_statistics.get('padded_tokens'):
+            self.batch_statistics['padding_ratio'] = (
+                1 - self.batch_statistics['real_tokens'] / self.batch_statistics['padded_tokens']
+            )
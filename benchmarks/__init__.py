@@ -0,0 +1,22 @@
+"""
+Réglages communs des scripts de mesure (uv run -m benchmarks.X).
+
+Les rapports de longueur appris pendant une mesure (petits modèles, textes
+synthétiques) ne doivent pas rejoindre ceux de l'utilisateur : ils sont écrits
+dans un dossier temporaire propre à l'exécution, hérité par les sous-processus
+(CLI, modes mesurés dans un interpréteur neuf). Les avertissements par segment
+(traduction arrêtée par sa borne) sont masqués.
+"""
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+
+if not os.getenv('BENCHMARK_TMPDIR'):
+    os.environ['BENCHMARK_TMPDIR'] = tempfile.mkdtemp(prefix='l2t-benchmark-')
+    atexit.register(shutil.rmtree, os.environ['BENCHMARK_TMPDIR'], ignore_errors=True)
+os.environ['OUTPUT_LENGTHS_FILE'] = os.path.join(os.environ['BENCHMARK_TMPDIR'], 'output_lengths.json')
+os.environ['LOG_LEVEL'] = 'ERROR'
+
+logging.getLogger('T2L').setLevel(logging.ERROR)
@@ -0,0 +1,107 @@
+"""
+Compare le backend ONNX Runtime au backend torch sur les textes de docs/.
+
+Les deux services traduisent les mêmes segments par translate_batch puis un par
+un par translate_text. Le script rapporte les traductions qui diffèrent, le
+chrF entre les deux sorties et les temps de chaque backend. Les calculs en
+virgule flottante ne sont pas identiques au bit près : un écart isolé reste
+possible, le code de sortie est non nul si moins de --min-identical des
+traductions sont identiques.
+
+Usage:
+    uv sync --extra onnx
+    uv run -m benchmarks.backend_parity -s fra_Latn -t eng_Latn
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+from app.translator import NLLBTranslationService
+from benchmarks.quantization_quality import load_segments
+from benchmarks.scores import chrf
+
+
+def run_backend(backend: str, segments: list[str], target: str, source: str) -> dict:
+    """Charge le modèle avec le backend demandé et traduit les segments par lot puis un par un."""
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.backend = backend
+
+    start = time.perf_counter()
+    service.initialize_translation_model()
+    load_seconds = time.perf_counter() - start
+
+    # Chauffe (allocations, premières sessions) hors mesure
+    service.translate_batch(segments[:2], target, source)
+
+    start = time.perf_counter()
+    batch = service.translate_batch(segments, target, source)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [service.translate_text(text, target, source) for text in segments]
+    single_seconds = time.perf_counter() - start
+
+    return {
+        'load_seconds': round(load_seconds, 2),
+        'translate_batch_seconds': round(batch_seconds, 2),
+        'translate_text_seconds': round(single_seconds, 2),
+        'translate_text_matches_batch': sum(a == b for a, b in zip(single, batch)),
+        'batch': batch,
+        'single': single,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et temps : backend ONNX Runtime vs torch")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--pattern', default='*.txt', help="Fichiers de docs/ à traduire")
+    parser.add_argument('--min-identical', type=float, default=0.95, help="Part minimale de traductions identiques")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    segments = load_segments(args.pattern)
+    results = {
+        backend: run_backend(backend, segments, args.target_language, args.source_language)
+        for backend in ('torch', 'onnx')
+    }
+    reference, candidate = results['torch'], results['onnx']
+
+    mismatches = [
+        {'index': idx, 'source': text, 'torch': old, 'onnx': new}
+        for idx, (text, old, new) in enumerate(zip(segments, reference['batch'], candidate['batch']))
+        if old != new
+    ]
+    single_identical = sum(a == b for a, b in zip(reference['single'], candidate['single']))
+    report = {
+        'segments': len(segments),
+        'torch': {k: v for k, v in reference.items() if k not in ('batch', 'single')},
+        'onnx': {k: v for k, v in candidate.items() if k not in ('batch', 'single')},
+        'translate_batch_identical': len(segments) - len(mismatches),
+        'translate_text_identical': single_identical,
+        'chrf_onnx_vs_torch': round(chrf(candidate['batch'], reference['batch']), 2),
+        'speedup_batch': round(
+            reference['translate_batch_seconds'] / max(candidate['translate_batch_seconds'], 1e-9), 2
+        ),
+        'speedup_text': round(
+            reference['translate_text_seconds'] / max(candidate['translate_text_seconds'], 1e-9), 2
+        ),
+        'mismatches': mismatches,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    identical = min(report['translate_batch_identical'], single_identical) / max(len(segments), 1)
+    if identical < args.min_identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Compare la latence par token en régime établi : exécution eager vs torch.compile (CPU).
+
+Chaque mode est exécuté dans un interpréteur neuf ; le mode compilé est lancé
+deux fois pour mesurer le démarrage à froid (compilation complète) puis le
+démarrage avec les artefacts persistés dans CACHE_DIR/compiled. Après le
+chargement (et le préchauffage en mode compilé), des phrases de docs/ sont
+traduites une par une par translate_text ; la télémétrie fournit le temps de
+génération et le nombre de tokens produits.
+
+Usage:
+    uv run -m benchmarks.compile_latency -s fra_Latn -t eng_Latn --sentences 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure(mode: str, sentences: int, target: str, source: str) -> dict:
+    """Charge le modèle dans le mode demandé puis mesure la traduction phrase par phrase."""
+    from app.telemetry import telemetry
+    from app.translator import NLLBTranslationService
+    from benchmarks.quantization_quality import load_segments
+
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.compile_model = mode == 'compiled'
+
+    start = time.perf_counter()
+    service.initialize_translation_model()
+    load_seconds = time.perf_counter() - start
+
+    segments = [segment for segment in load_segments('*.txt') if len(segment) < 400][:sentences]
+    # Première phrase hors mesure (allocations, graphes non couverts par le préchauffage)
+    service.translate_text(segments[0], target, source)
+
+    telemetry.enable()
+    latencies = []
+    for segment in segments:
+        start = time.perf_counter()
+        service.translate_text(segment, target, source)
+        latencies.append(1000 * (time.perf_counter() - start))
+    report = telemetry.report()
+
+    tokens_out = report['counters'].get('tokens_out', 0)
+    generate_seconds = report['stages'].get('generate', {}).get('seconds', 0.0)
+    return {
+        'mode': mode,
+        'load_seconds': round(load_seconds, 2),
+        'sentences': len(segments),
+        'latency_ms_median': round(statistics.median(latencies), 1),
+        'generate_ms_per_token': round(1000 * generate_seconds / max(tokens_out, 1), 2),
+        'tokens_out': tokens_out,
+    }
+
+
+def run_subprocess(mode: str, args) -> dict:
+    environment = dict(os.environ, CUDA_VISIBLE_DEVICES='')
+    completed = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.compile_latency', '--run', mode,
+            '--sentences', str(args.sentences), '-s', args.source_language, '-t', args.target_language,
+        ],
+        cwd=ROOT, env=environment, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {'mode': mode, 'error': completed.stderr.strip()[-1000:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence par token : eager vs torch.compile (CPU)")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--sentences', type=int, default=50, help="Phrases traduites une par une")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    parser.add_argument('--run', choices=['eager', 'compiled'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(measure(args.run, args.sentences, args.target_language, args.source_language)))
+        return
+
+    eager = run_subprocess('eager', args)
+    cold = run_subprocess('compiled', args)
+    warm = run_subprocess('compiled', args)
+    report = {'eager': eager, 'compiled_cold_start': cold, 'compiled_warm_start': warm}
+    if 'error' not in eager and 'error' not in warm:
+        report['per_token_speedup'] = round(
+            eager['generate_ms_per_token'] / max(warm['generate_ms_per_token'], 1e-9), 2
+        )
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare les profils de décodage (fast, balanced, quality) sur les textes de docs/.
+
+Le modèle est chargé une seule fois ; pour chaque profil sont mesurés le débit
+par lots (translate_batch), la latence d'un segment isolé (translate_text, où
+s'applique le décodage assisté si ASSISTANT_MODEL est défini) et la qualité
+en chrF/BLEU contre la sortie du profil quality prise comme référence.
+
+Usage:
+    uv run -m benchmarks.decoding_profiles -s fra_Latn -t eng_Latn
+    ASSISTANT_MODEL=facebook/nllb-200-distilled-600M MODEL_NAME=facebook/nllb-200-1.3B \\
+        uv run -m benchmarks.decoding_profiles
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+from app.translator import DECODING_PROFILES, NLLBTranslationService
+from benchmarks.quantization_quality import load_segments
+from benchmarks.scores import bleu, chrf
+
+
+def run_profile(service: NLLBTranslationService, profile: str, segments: list[str],
+                target: str, source: str, latency_samples: int) -> dict:
+    """Traduit tous les segments puis mesure la latence unitaire avec le profil demandé."""
+    service.decoding_profile = profile
+
+    start = time.perf_counter()
+    translations = service.translate_batch(segments, target, source)
+    translate_seconds = time.perf_counter() - start
+
+    latencies = []
+    for segment in segments[:latency_samples]:
+        start = time.perf_counter()
+        service.translate_text(segment, target, source)
+        latencies.append(1000 * (time.perf_counter() - start))
+
+    return {
+        'parameters': service._generation_parameters(),
+        'translate_seconds': round(translate_seconds, 2),
+        'segments_per_second': round(len(segments) / translate_seconds, 2),
+        'latency_ms_median': round(statistics.median(latencies), 1) if latencies else None,
+        'translations': translations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vitesse et qualité des profils de décodage")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--pattern', default='*.txt', help="Fichiers de docs/ à traduire")
+    parser.add_argument('--latency-samples', type=int, default=20, help="Segments traduits un par un")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    segments = load_segments(args.pattern)
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    # Profil balanced au chargement : charge le modèle brouillon si ASSISTANT_MODEL est défini
+    service.decoding_profile = 'balanced'
+    service.initialize_translation_model()
+
+    # Chauffe (allocations, noyaux) hors mesure
+    service.translate_batch(segments[:4], args.target_language, args.source_language)
+
+    results = {}
+    for profile in ('quality', *[name for name in DECODING_PROFILES if name != 'quality']):
+        results[profile] = run_profile(
+            service, profile, segments, args.target_language, args.source_language, args.latency_samples
+        )
+
+    reference = results['quality']
+    report = {'segments': len(segments), 'assistant_model': os.getenv('ASSISTANT_MODEL') or None, 'profiles': {}}
+    for profile, result in results.items():
+        summary = {k: v for k, v in result.items() if k != 'translations'}
+        if profile != 'quality':
+            summary['chrf_vs_quality'] = round(chrf(result['translations'], reference['translations']), 2)
+            summary['bleu_vs_quality'] = round(bleu(result['translations'], reference['translations']), 2)
+            summary['speedup_vs_quality'] = round(
+                reference['translate_seconds'] / max(result['translate_seconds'], 1e-9), 2
+            )
+        report['profiles'][profile] = summary
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Mesure le coût et la justesse de la détection de langue source par segment (CPU).
+
+Un document mixte est formé à partir des segments de docs/ (langue source -s)
+et de leurs traductions vers les langues --mix (vocabulaire complet, profil
+courant). Les segments sont répétés jusqu'à --segments puis classés en un seul
+appel ; sont rapportés le temps par segment, la justesse contre les langues
+connues et le rapport au temps de traduction d'un segment.
+
+Usage:
+    uv run -m benchmarks.language_detection -s fra_Latn --mix eng_Latn,spa_Latn --segments 5000
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+from app.language_detection import LanguageDetector
+from app.translator import NLLBTranslationService
+from benchmarks.quantization_quality import load_segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût et justesse de la détection de langue source")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('--mix', default='eng_Latn,spa_Latn', help="Langues ajoutées au document mixte")
+    parser.add_argument('--pattern', default='*.txt', help="Fichiers de docs/ utilisés")
+    parser.add_argument('--sample', type=int, default=50, help="Segments traduits par langue du mélange")
+    parser.add_argument('--segments', type=int, default=5000, help="Segments classés en un appel")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    segments = load_segments(args.pattern)[:args.sample]
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.initialize_translation_model()
+
+    labelled = [(segment, args.source_language) for segment in segments]
+    translate_seconds = 0.0
+    translated_segments = 0
+    for language in [code for code in args.mix.split(',') if code]:
+        start = time.perf_counter()
+        translations = service.translate_batch(segments, language, args.source_language)
+        translate_seconds += time.perf_counter() - start
+        translated_segments += len(segments)
+        labelled += [(translation, language) for translation in translations]
+
+    corpus = list(itertools.islice(itertools.cycle(labelled), args.segments))
+    texts = [text for text, _ in corpus]
+
+    detector = LanguageDetector(service.supported_languages)
+    start = time.perf_counter()
+    detector.load()
+    load_seconds = time.perf_counter() - start
+
+    detector.detect(texts[:10])
+    start = time.perf_counter()
+    detected = detector.detect(texts)
+    detect_seconds = time.perf_counter() - start
+
+    errors = Counter(
+        f"{expected}->{language}" for (_, expected), language in zip(corpus, detected) if language != expected
+    )
+    detect_per_segment = detect_seconds / len(texts)
+    translate_per_segment = translate_seconds / max(translated_segments, 1)
+    report = {
+        'segments': len(texts),
+        'languages': dict(Counter(language for _, language in corpus)),
+        'load_seconds': round(load_seconds, 2),
+        'detect_seconds': round(detect_seconds, 3),
+        'detect_us_per_segment': round(1e6 * detect_per_segment, 1),
+        'translate_ms_per_segment': round(1000 * translate_per_segment, 1),
+        'detect_share_of_translation': round(detect_per_segment / max(translate_per_segment, 1e-9), 5),
+        'accuracy': round(1 - sum(errors.values()) / len(texts), 4),
+        'confusions': dict(errors.most_common(10)),
+    }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Compare le moteur de génération par lots à l'ancien chemin transformers.pipeline.
+
+Le pipeline "translation" est reconstruit sur le modèle et le tokenizer déjà
+chargés par le service, avec une langue source NLLB correcte (l'ancien appel
+passait src_lang=f"{source}>"). À paramètres de décodage identiques, les deux
+chemins doivent produire les mêmes traductions ; le script rapporte les
+divergences, le chrF entre les deux sorties et les temps de chaque chemin.
+Le code de sortie est non nul si une traduction diffère.
+
+Usage:
+    uv run -m benchmarks.pipeline_parity -s fra_Latn -t eng_Latn
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+from transformers import pipeline
+
+from app.translator import NLLBTranslationService
+from benchmarks.quantization_quality import load_segments
+from benchmarks.scores import chrf
+
+
+def run_pipeline(service: NLLBTranslationService, segments: list[str], target: str, source: str, beams: int) -> list[str]:
+    """Ancien chemin : pipeline transformers construit sur le modèle du service."""
+    translator = pipeline(
+        "translation",
+        model=service.translation_model,
+        tokenizer=service.tokenizer,
+        truncation=True,
+        max_length=int(os.getenv('MAX_LENGTH', 1024))
+    )
+    options = {'num_beams': beams, 'early_stopping': True} if beams > 1 else {}
+    results = translator(
+        segments,
+        src_lang=source,
+        tgt_lang=target,
+        batch_size=int(os.getenv('BATCH_SIZE', 8)),
+        clean_up_tokenization_spaces=True,
+        **options
+    )
+    return [result['translation_text'] for result in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et temps : moteur par lots vs pipeline transformers")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--pattern', default='*.txt', help="Fichiers de docs/ à traduire")
+    parser.add_argument(
+        '--pipeline-beams',
+        type=int,
+        default=1,
+        help="Beams du pipeline (>1 rejoue l'ancien NUM_BEAMS ; les sorties peuvent alors différer)"
+    )
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    segments = load_segments(args.pattern)
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.initialize_translation_model()
+
+    start = time.perf_counter()
+    legacy = run_pipeline(service, segments, args.target_language, args.source_language, args.pipeline_beams)
+    pipeline_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = service.translate_batch(segments, args.target_language, args.source_language)
+    engine_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [service.translate_text(text, args.target_language, args.source_language) for text in segments]
+    single_seconds = time.perf_counter() - start
+
+    mismatches = [
+        {'index': idx, 'source': text, 'pipeline': old, 'engine': new}
+        for idx, (text, old, new) in enumerate(zip(segments, legacy, engine))
+        if old != new
+    ]
+    report = {
+        'segments': len(segments),
+        'pipeline_seconds': round(pipeline_seconds, 2),
+        'translate_batch_seconds': round(engine_seconds, 2),
+        'translate_text_seconds': round(single_seconds, 2),
+        'identical': len(segments) - len(mismatches),
+        'translate_text_matches_batch': sum(a == b for a, b in zip(single, engine)),
+        'chrf_engine_vs_pipeline': round(chrf(engine, legacy), 2),
+        'mismatches': mismatches,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if mismatches and args.pipeline_beams <= 1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
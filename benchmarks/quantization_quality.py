@@ -0,0 +1,93 @@
+"""
+Compare l'inférence CPU float32 et int8 (quantification dynamique) sur les textes de docs/.
+
+Pour chaque mode : temps de chargement, latence de traduction, taille des poids
+et mémoire résidente. La qualité int8 est mesurée en chrF/BLEU contre la sortie
+float32 prise comme référence.
+
+Usage:
+    uv run -m benchmarks.quantization_quality -s fra_Latn -t eng_Latn
+"""
+import argparse
+import json
+import os
+import resource
+import time
+from pathlib import Path
+
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+from app.optimizations import model_size_bytes
+from app.translator import NLLBTranslationService
+from app.utils import TextSegmenter
+from benchmarks.scores import bleu, chrf
+
+DOCS_DIR = Path(__file__).resolve().parent.parent / 'docs'
+
+
+def load_segments(pattern: str) -> list[str]:
+    """Paragraphes non vides des textes de référence."""
+    segments = []
+    for path in sorted(DOCS_DIR.glob(pattern)):
+        if path.stem.endswith('_translated'):
+            continue
+        text = path.read_text(encoding='utf-8')
+        segments.extend(p for p in TextSegmenter.split_paragraphs(text) if p.strip())
+    return segments
+
+
+def run_mode(quantization, segments: list[str], target: str, source: str) -> dict:
+    """Charge le modèle dans le mode demandé et traduit tous les segments."""
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.quantization = quantization
+
+    start = time.perf_counter()
+    service.initialize_translation_model()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    translations = service.translate_batch(segments, target, source)
+    translate_seconds = time.perf_counter() - start
+
+    return {
+        'mode': quantization or 'float32',
+        'load_seconds': round(load_seconds, 2),
+        'translate_seconds': round(translate_seconds, 2),
+        'ms_per_segment': round(1000 * translate_seconds / len(segments), 1),
+        'weights_mb': round(model_size_bytes(service.translation_model) / 2**20, 1),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'translations': translations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qualité et vitesse float32 vs int8 sur CPU")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--pattern', default='*.txt', help="Fichiers de docs/ à traduire")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    segments = load_segments(args.pattern)
+    reference = run_mode(None, segments, args.target_language, args.source_language)
+    quantized = run_mode('int8', segments, args.target_language, args.source_language)
+
+    report = {
+        'segments': len(segments),
+        'float32': {k: v for k, v in reference.items() if k != 'translations'},
+        'int8': {k: v for k, v in quantized.items() if k != 'translations'},
+        'int8_vs_float32': {
+            'chrf': round(chrf(quantized['translations'], reference['translations']), 2),
+            'bleu': round(bleu(quantized['translations'], reference['translations']), 2),
+            'speedup': round(reference['translate_seconds'] / max(quantized['translate_seconds'], 1e-9), 2),
+        },
+    }
+    # ru_maxrss est un maximum cumulé sur le processus : le pic int8 inclut le chargement float32
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
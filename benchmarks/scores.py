@@ -0,0 +1,68 @@
+"""
+Scores de qualité de traduction (chrF et BLEU corpus) sans dépendance externe.
+
+Implémentations compactes suivant les définitions de sacrebleu avec leurs
+paramètres par défaut (chrF : n-grammes de caractères 1..6, beta=2 ; BLEU :
+n-grammes de mots 1..4, pénalité de brièveté, sans lissage).
+"""
+import math
+from collections import Counter
+
+
+def _ngrams(tokens, n: int) -> Counter:
+    return Counter(tuple(tokens[idx:idx + n]) for idx in range(len(tokens) - n + 1))
+
+
+def chrf(hypotheses: list[str], references: list[str], max_order: int = 6, beta: float = 2.0) -> float:
+    """chrF corpus (0-100) : F-score des n-grammes de caractères, espaces ignorés."""
+    matches = [0] * max_order
+    hyp_totals = [0] * max_order
+    ref_totals = [0] * max_order
+
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp_chars = list(hypothesis.replace(" ", ""))
+        ref_chars = list(reference.replace(" ", ""))
+        for order in range(1, max_order + 1):
+            hyp_ngrams = _ngrams(hyp_chars, order)
+            ref_ngrams = _ngrams(ref_chars, order)
+            matches[order - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            hyp_totals[order - 1] += sum(hyp_ngrams.values())
+            ref_totals[order - 1] += sum(ref_ngrams.values())
+
+    scores = []
+    for match, hyp_total, ref_total in zip(matches, hyp_totals, ref_totals):
+        if not hyp_total or not ref_total:
+            continue
+        precision = match / hyp_total
+        recall = match / ref_total
+        if precision + recall == 0:
+            scores.append(0.0)
+            continue
+        scores.append((1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall))
+
+    return 100 * sum(scores) / len(scores) if scores else 0.0
+
+
+def bleu(hypotheses: list[str], references: list[str], max_order: int = 4) -> float:
+    """BLEU corpus (0-100) sur une tokenisation par espaces."""
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hyp_length = 0
+    ref_length = 0
+
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp_tokens = hypothesis.split()
+        ref_tokens = reference.split()
+        hyp_length += len(hyp_tokens)
+        ref_length += len(ref_tokens)
+        for order in range(1, max_order + 1):
+            hyp_ngrams = _ngrams(hyp_tokens, order)
+            matches[order - 1] += sum((hyp_ngrams & _ngrams(ref_tokens, order)).values())
+            totals[order - 1] += sum(hyp_ngrams.values())
+
+    if not hyp_length or min(matches) == 0:
+        return 0.0
+
+    log_precision = sum(math.log(match / total) for match, total in zip(matches, totals)) / max_order
+    brevity_penalty = 1.0 if hyp_length > ref_length else math.exp(1 - ref_length / hyp_length)
+    return 100 * brevity_penalty * math.exp(log_precision)
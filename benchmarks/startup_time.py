@@ -0,0 +1,118 @@
+"""
+Mesure le temps de démarrage du CLI et du chargement du modèle.
+
+Chaque scénario est exécuté dans un interpréteur neuf (aucun module déjà en
+cache) :
+- import de app.cli et commandes sans modèle (--help, --list-languages) ;
+  le rapport indique si torch/transformers ont été importés ;
+- chargement du modèle via from_pretrained puis via l'instantané local
+  (MODEL_SNAPSHOT), le premier passage créant l'instantané.
+
+Usage:
+    uv run -m benchmarks.startup_time --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Scénarios sans modèle : le script affiche les modules lourds importés
+IMPORT_PROBE = (
+    "import sys, runpy\n"
+    "sys.argv = ['l2t'] + sys.argv[1:]\n"
+    "try:\n"
+    "    runpy.run_module('app.main', run_name='__main__') if len(sys.argv) > 1 else __import__('app.cli')\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "heavy = [name for name in ('torch', 'transformers', 'PyPDF2') if name in sys.modules]\n"
+    "print('HEAVY=' + ','.join(heavy), file=sys.stderr)\n"
+)
+
+MODEL_LOAD_PROBE = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from app.translator import NLLBTranslationService\n"
+    "service = NLLBTranslationService()\n"
+    "service.initialize_translation_model()\n"
+    "print(f'LOAD={time.perf_counter() - start:.3f}')\n"
+)
+
+
+def run_python(code: str, arguments: list[str], environment: dict) -> tuple:
+    """Exécute un script dans un interpréteur neuf ; retourne (durée, stdout, stderr)."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-c', code, *arguments],
+        cwd=ROOT,
+        env=environment,
+        capture_output=True,
+        text=True
+    )
+    return time.perf_counter() - start, completed.stdout, completed.stderr
+
+
+def summarize(durations: list[float]) -> dict:
+    return {
+        'median_seconds': round(statistics.median(durations), 3),
+        'min_seconds': round(min(durations), 3),
+        'max_seconds': round(max(durations), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage du CLI et du chargement du modèle")
+    parser.add_argument('--runs', type=int, default=5, help="Répétitions par scénario")
+    parser.add_argument('--skip-model', action='store_true', help="Ne mesure pas le chargement du modèle")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    environment = dict(os.environ, CUDA_VISIBLE_DEVICES=os.getenv('CUDA_VISIBLE_DEVICES', ''))
+    report = {'python': sys.version.split()[0], 'commands': {}, 'model_load': {}}
+
+    for label, arguments in (
+        ('import app.cli', []),
+        ('--help', ['--help']),
+        ('--list-languages', ['--list-languages']),
+    ):
+        durations = []
+        heavy = ''
+        for _ in range(args.runs):
+            duration, _, stderr = run_python(IMPORT_PROBE, arguments, environment)
+            durations.append(duration)
+            heavy = next((line[6:] for line in stderr.splitlines() if line.startswith('HEAVY=')), heavy)
+        report['commands'][label] = dict(summarize(durations), heavy_modules=heavy.split(',') if heavy else [])
+
+    if not args.skip_model:
+        for label, snapshot in (('from_pretrained', 'False'), ('snapshot', 'True')):
+            model_environment = dict(environment, MODEL_SNAPSHOT=snapshot, USE_TRANSLATION_MEMORY='False')
+            if snapshot == 'True':
+                # Premier passage : création de l'instantané, exclu de la mesure
+                run_python(MODEL_LOAD_PROBE, [], model_environment)
+
+            process_durations = []
+            load_durations = []
+            for _ in range(args.runs):
+                duration, stdout, stderr = run_python(MODEL_LOAD_PROBE, [], model_environment)
+                load = next((line[5:] for line in stdout.splitlines() if line.startswith('LOAD=')), None)
+                if load is None:
+                    raise RuntimeError(f"Échec du chargement ({label}): {stderr.strip()[-500:]}")
+                process_durations.append(duration)
+                load_durations.append(float(load))
+            report['model_load'][label] = {
+                'process': summarize(process_durations),
+                'load': summarize(load_durations),
+            }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
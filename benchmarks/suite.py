@@ -0,0 +1,342 @@
+"""
+Suite de benchmarks reproductible : démarrage, latence, débit et mémoire.
+
+Chaque configuration (précision × budget de tokens par lot × beams) est mesurée
+dans un interpréteur neuf, pour que le pic de mémoire résidente et les caches
+ne dépendent pas des configurations précédentes. Sont mesurés :
+- le démarrage du CLI et le chargement du modèle (benchmarks.startup_time) ;
+- la latence d'une phrase (translate_text) : p50, p95, p99 ;
+- le débit par lots (translate_batch) sur les textes de docs/ répétés et sur des
+  distributions synthétiques de longueurs : segments/s, tokens/s, documents/heure ;
+- une traduction de bout en bout par le CLI (--metrics-out) ;
+- le pic de mémoire résidente.
+
+Les résultats sont enregistrés en JSON (commit, versions, matériel) pour être
+comparés d'un commit à l'autre. Tout tourne sur CPU ; --tiny-model remplace
+NLLB par un petit modèle de même architecture initialisé aléatoirement
+(seul le tokenizer NLLB est téléchargé) pour une exécution rapide en CI.
+
+Usage:
+    uv run -m benchmarks.suite --tiny-model
+    uv run -m benchmarks.suite --precisions float32,int8 --batch-tokens 1024,4096 --beams 1,4
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = ROOT / 'docs'
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# Distributions synthétiques : (nom, bornes en mots) ; "mixed" suit une loi log-normale
+SYNTHETIC_DISTRIBUTIONS = {
+    'short': (3, 12),
+    'long': (40, 90),
+    'mixed': None,
+}
+
+
+def load_documents() -> list[str]:
+    """Textes source de docs/ (les sorties *_translated sont ignorées)."""
+    return [
+        path.read_text(encoding='utf-8')
+        for path in sorted(DOCS_DIR.glob('*.txt'))
+        if not path.stem.endswith('_translated')
+    ]
+
+
+def build_corpus(scale: int, synthetic_segments: int, seed: int) -> dict:
+    """
+    Construit le corpus fixe : chaque document de docs/ répété `scale` fois et
+    des segments synthétiques tirés du vocabulaire de ces documents.
+    """
+    documents = load_documents()
+    rng = random.Random(seed)
+    vocabulary = [word for document in documents for word in document.split()]
+
+    corpus = {'documents': ["\n\n".join([document] * scale) for document in documents]}
+    for name, bounds in SYNTHETIC_DISTRIBUTIONS.items():
+        segments = []
+        for _ in range(synthetic_segments):
+            if bounds:
+                length = rng.randint(*bounds)
+            else:
+                length = max(1, min(200, int(rng.lognormvariate(2.7, 0.7))))
+            segments.append(" ".join(rng.choice(vocabulary) for _ in range(length)).capitalize() + ".")
+        corpus[name] = segments
+
+    # Phrases courtes du corpus réel pour la latence unitaire
+    sentences = [
+        line.strip() for document in documents for line in document.split('\n')
+        if 20 <= len(line.strip()) <= 200
+    ]
+    corpus['sentences'] = sentences
+    return corpus
+
+
+def create_tiny_model(target_dir: Path, base_model: str) -> Path:
+    """Petit modèle M2M100 (architecture NLLB) aléatoire, avec le tokenizer NLLB."""
+    from transformers import AutoTokenizer, M2M100Config, M2M100ForConditionalGeneration
+
+    if (target_dir / 'config.json').exists():
+        return target_dir
+
+    tokenizer = AutoTokenizer.from_pretrained(base_model)
+    config = M2M100Config(
+        vocab_size=len(tokenizer),
+        d_model=64,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_position_embeddings=1024,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.eos_token_id,
+    )
+    # Génération courte et déterministe : un modèle aléatoire ne produit jamais EOS de lui-même
+    config.max_length = 64
+    model = M2M100ForConditionalGeneration(config)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    model.save_pretrained(target_dir)
+    tokenizer.save_pretrained(target_dir)
+    return target_dir
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Percentile par interpolation linéaire."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_configuration(config: dict) -> dict:
+    """Mesure une configuration dans le processus courant (appelé via --run-config)."""
+    from app.telemetry import telemetry
+    from app.translator import NLLBTranslationService
+    from app.utils import TextSegmenter
+
+    corpus = config['corpus']
+    source, target = config['source_language'], config['target_language']
+
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.quantization = config['precision'] if config['precision'] != 'float32' else None
+    service.num_beams = config['beams']
+
+    start = time.perf_counter()
+    service.initialize_translation_model()
+    result = {'load_seconds': time.perf_counter() - start}
+
+    # Latence unitaire (après une traduction de chauffe)
+    sentences = corpus['sentences'][:config['latency_samples']] or ["Le chat dort."]
+    service.translate_text(sentences[0], target, source)
+    durations = []
+    for sentence in itertools.islice(itertools.cycle(sentences), config['latency_samples']):
+        start = time.perf_counter()
+        service.translate_text(sentence, target, source)
+        durations.append((time.perf_counter() - start) * 1000)
+    result['latency_ms'] = {
+        'p50': percentile(durations, 0.50),
+        'p95': percentile(durations, 0.95),
+        'p99': percentile(durations, 0.99),
+        'mean': statistics.mean(durations),
+    }
+
+    # Débit par lots, un jeu de mesures par corpus
+    throughput = {}
+    for name in ['documents', *SYNTHETIC_DISTRIBUTIONS]:
+        if name == 'documents':
+            segments = [
+                paragraph for document in corpus['documents']
+                for paragraph in TextSegmenter.split_paragraphs(document) if paragraph.strip()
+            ]
+        else:
+            segments = corpus[name]
+
+        telemetry.enable()
+        start = time.perf_counter()
+        service.translate_batch(segments, target, source, max_batch_tokens=config['max_batch_tokens'])
+        elapsed = time.perf_counter() - start
+        report = telemetry.report()
+        telemetry.enabled = False
+
+        measures = {
+            'segments': len(segments),
+            'seconds': elapsed,
+            'segments_per_second': len(segments) / elapsed,
+            'output_tokens_per_second': report['counters'].get('tokens_out', 0) / elapsed,
+            'input_tokens_per_second': report['counters'].get('tokens_in', 0) / elapsed,
+            'batch_fill_ratio': report['derived'].get('batch_fill_ratio'),
+        }
+        if name == 'documents':
+            measures['documents_per_hour'] = 3600 * len(corpus['documents']) / elapsed
+        throughput[name] = measures
+
+    result['throughput'] = throughput
+    result['peak_rss_bytes'] = telemetry.peak_memory()['peak_rss_bytes']
+    return result
+
+
+def run_cli(document: str, environment: dict, args) -> dict:
+    """Traduction de bout en bout d'un document par le CLI, avec rapport de télémétrie."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = Path(work_dir) / 'document.txt'
+        input_path.write_text(document, encoding='utf-8')
+        metrics_path = Path(work_dir) / 'metrics.json'
+
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [
+                sys.executable, '-m', 'app.main', '-f', str(input_path),
+                '-s', args.source_language, '-t', args.target_language,
+                '--no-translation-memory', '-o', str(Path(work_dir) / 'out.txt'),
+                '--metrics-out', str(metrics_path),
+            ],
+            cwd=ROOT, env=environment, capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0 or not metrics_path.exists():
+            return {'error': completed.stdout[-500:] + completed.stderr[-500:]}
+
+        report = json.loads(metrics_path.read_text(encoding='utf-8'))
+        return {
+            'process_seconds': elapsed,
+            'documents_per_hour': 3600 / elapsed,
+            'stages': {name: stage['seconds'] for name, stage in report['stages'].items()},
+            'derived': report['derived'],
+            'peak_rss_bytes': report['memory']['peak_rss_bytes'],
+        }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de traduction (CPU)")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--precisions', default='float32', help="Liste: float32,int8")
+    parser.add_argument('--batch-tokens', default='4096', help="Budgets MAX_BATCH_TOKENS (0 = lots fixes)")
+    parser.add_argument('--beams', default='1', help="Nombres de beams")
+    parser.add_argument('--scale', type=int, default=5, help="Répétitions de chaque document de docs/")
+    parser.add_argument('--synthetic-segments', type=int, default=200)
+    parser.add_argument('--latency-samples', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--tiny-model', action='store_true', help="Petit modèle aléatoire (CI)")
+    parser.add_argument('--skip-startup', action='store_true')
+    parser.add_argument('--skip-cli', action='store_true')
+    parser.add_argument('--output', help="Fichier JSON (défaut: benchmarks/results/<commit>-<date>.json)")
+    parser.add_argument('--run-config', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        config = json.loads(Path(args.run_config).read_text(encoding='utf-8'))
+        print(json.dumps(run_configuration(config)))
+        return
+
+    environment = dict(os.environ, CUDA_VISIBLE_DEVICES='', USE_TRANSLATION_MEMORY='False')
+    model_name = environment.get('MODEL_NAME', 'facebook/nllb-200-distilled-600M')
+    if args.tiny_model:
+        cache_dir = Path(environment.get('CACHE_DIR', ROOT / '.model_cache'))
+        model_name = str(create_tiny_model(cache_dir / 'tiny-nllb', model_name).resolve())
+        environment['MODEL_NAME'] = model_name
+
+    corpus = build_corpus(args.scale, args.synthetic_segments, args.seed)
+    results = {
+        'revision': git_revision(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+        },
+        'model': model_name,
+        'corpus': {
+            'documents': len(corpus['documents']),
+            'scale': args.scale,
+            'synthetic_segments': args.synthetic_segments,
+            'seed': args.seed,
+        },
+        'configurations': [],
+    }
+
+    if not args.skip_startup:
+        startup = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup_time', '--runs', '3', '--skip-model'],
+            cwd=ROOT, env=environment, capture_output=True, text=True
+        )
+        results['startup'] = json.loads(startup.stdout) if startup.returncode == 0 else {'error': startup.stderr[-500:]}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for precision, max_batch_tokens, beams in itertools.product(
+            args.precisions.split(','),
+            [int(value) for value in args.batch_tokens.split(',')],
+            [int(value) for value in args.beams.split(',')],
+        ):
+            config = {
+                'precision': precision,
+                'max_batch_tokens': max_batch_tokens,
+                'beams': beams,
+                'source_language': args.source_language,
+                'target_language': args.target_language,
+                'latency_samples': args.latency_samples,
+                'corpus': corpus,
+            }
+            config_path = Path(work_dir) / 'config.json'
+            config_path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+
+            print(f"Configuration: {precision}, {max_batch_tokens} tokens/lot, {beams} beams", file=sys.stderr)
+            completed = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.suite', '--run-config', str(config_path)],
+                cwd=ROOT, env=environment, capture_output=True, text=True
+            )
+            measures = (
+                json.loads(completed.stdout.strip().splitlines()[-1])
+                if completed.returncode == 0 else {'error': completed.stderr[-1000:]}
+            )
+            results['configurations'].append({
+                'precision': precision,
+                'max_batch_tokens': max_batch_tokens,
+                'beams': beams,
+                **measures,
+            })
+
+    if not args.skip_cli:
+        for precision in args.precisions.split(','):
+            cli_environment = dict(environment, QUANTIZATION='' if precision == 'float32' else precision)
+            results.setdefault('cli', {})[precision] = run_cli(corpus['documents'][0], cli_environment, args)
+
+    output_path = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{results['revision']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"Résultats enregistrés dans {output_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark de la latence d'un appel à translate_text sur CPU.
+
+Compare le comportement historique (vidage du cache CUDA, construction d'un
+torch.device et model.to(device) à chaque appel) au placement unique effectué
+dans initialize_translation_model.
+
+Usage:
+    uv run -m benchmarks.translate_call_latency --runs 20
+"""
+import argparse
+import os
+import statistics
+import time
+
+# Le benchmark mesure le chemin CPU : le GPU est masqué avant l'import de torch
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+import torch
+
+from app.translator import NLLBTranslationService
+
+
+def measure(service: NLLBTranslationService, text: str, target: str, source: str, runs: int, legacy: bool) -> list[float]:
+    """Mesure la durée (ms) de `runs` appels successifs à translate_text."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if legacy:
+            # Surcoût de l'ancienne implémentation, rejoué avant chaque appel
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            service.translation_model.to(device)
+        service.translate_text(text, target, source)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence par appel de translate_text (avant/après)")
+    parser.add_argument('--text', default="Le chat dort sur le canapé.")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.initialize_translation_model()
+    service.translate_text(args.text, args.target_language, args.source_language)  # Chauffe
+
+    for label, legacy in (("avant (placement à chaque appel)", True), ("après (placement unique)", False)):
+        durations = measure(service, args.text, args.target_language, args.source_language, args.runs, legacy)
+        print(
+            f"{label:35} médiane {statistics.median(durations):8.1f} ms  "
+            f"moyenne {statistics.mean(durations):8.1f} ms  min {min(durations):8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare la projection de sortie complète et le vocabulaire réduit de la langue cible (CPU).
+
+Les segments de docs/ sont partagés en deux moitiés. Sans --corpus, le
+vocabulaire de la langue cible est construit à partir des traductions
+(vocabulaire complet) de la première moitié, pour ne pas évaluer sur les
+textes qui l'ont produit ; la seconde moitié est traduite avec les deux
+projections. Le vocabulaire est écrit dans un dossier temporaire (VOCABULARY_DIR
+n'est pas modifié). Sont rapportés la taille du sous-ensemble, le gain de temps,
+les lots régénérés avec le vocabulaire complet et la qualité en chrF/BLEU contre
+la sortie complète prise comme référence.
+
+Usage:
+    uv run -m benchmarks.vocabulary_pruning -s fra_Latn -t eng_Latn
+    uv run -m benchmarks.vocabulary_pruning -t eng_Latn --corpus "corpus/en/*.txt"
+"""
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+
+from app.translator import NLLBTranslationService
+from app.vocabulary import TargetVocabulary
+from benchmarks.quantization_quality import load_segments
+from benchmarks.scores import bleu, chrf
+
+
+def translate(service: NLLBTranslationService, segments: list[str], target: str, source: str,
+              pruned: bool) -> tuple[list[str], float]:
+    """Traduit les segments avec ou sans restriction du vocabulaire de sortie."""
+    projection = service._output_projection
+    if not pruned:
+        service._output_projection = None
+    try:
+        start = time.perf_counter()
+        translations = service.translate_batch(segments, target, source)
+        return translations, time.perf_counter() - start
+    finally:
+        service._output_projection = projection
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vitesse et qualité du vocabulaire de sortie réduit")
+    parser.add_argument('-s', '--source-language', default='fra_Latn')
+    parser.add_argument('-t', '--target-language', default='eng_Latn')
+    parser.add_argument('--pattern', default='*.txt', help="Fichiers de docs/ à traduire")
+    parser.add_argument('--corpus', nargs='*', help="Textes de référence dans la langue cible (motifs glob)")
+    parser.add_argument('--min-count', type=int, default=1, help="Occurrences minimales d'un token")
+    parser.add_argument('--output', help="Fichier JSON de résultats (optionnel)")
+    args = parser.parse_args()
+
+    segments = load_segments(args.pattern)
+    held_out = segments[len(segments) // 2:] if not args.corpus else segments
+
+    service = NLLBTranslationService()
+    service.use_translation_memory = False
+    service.vocabulary_pruning = True
+    service.initialize_translation_model()
+    if service._output_projection is None:
+        raise SystemExit("Vocabulaire réduit non disponible pour ce modèle (voir les avertissements)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        service.vocabularies = TargetVocabulary(directory)
+        if args.corpus:
+            paths = sorted({path for pattern in args.corpus for path in glob.glob(pattern, recursive=True)})
+            texts = [Path(path).read_text(encoding='utf-8', errors='replace') for path in paths]
+            corpus_source = paths
+        else:
+            texts, _ = translate(
+                service, segments[:len(segments) // 2], args.target_language, args.source_language, pruned=False
+            )
+            corpus_source = 'traductions complètes de la première moitié de docs/'
+        ids = TargetVocabulary.build(service.tokenizer, texts, min_count=args.min_count)
+        service.vocabularies.save(args.target_language, ids)
+
+        # Chauffe (allocations, noyaux, sélection des lignes de projection) hors mesure
+        translate(service, held_out[:4], args.target_language, args.source_language, pruned=True)
+
+        reference, full_seconds = translate(
+            service, held_out, args.target_language, args.source_language, pruned=False
+        )
+        pruned, pruned_seconds = translate(
+            service, held_out, args.target_language, args.source_language, pruned=True
+        )
+        fallbacks = service.batch_statistics.get('vocabulary_fallbacks', 0)
+
+    report = {
+        'segments': len(held_out),
+        'corpus': corpus_source,
+        'vocabulary_size': len(service.tokenizer),
+        'subset_size': len(ids),
+        'subset_ratio': round(len(ids) / len(service.tokenizer), 4),
+        'full_seconds': round(full_seconds, 2),
+        'pruned_seconds': round(pruned_seconds, 2),
+        'speedup': round(full_seconds / max(pruned_seconds, 1e-9), 2),
+        'batches': service.batch_statistics.get('batches'),
+        'vocabulary_fallbacks': fallbacks,
+        'identical': sum(a == b for a, b in zip(pruned, reference)),
+        'chrf_vs_full': round(chrf(pruned, reference), 2),
+        'bleu_vs_full': round(bleu(pruned, reference), 2),
+    }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import unittest
+
+from app.language_detection import LanguageDetector
+
+
+class StubModel:
+    """Modèle fastText factice : la langue est le premier mot du segment (fra, eng, xxx)."""
+
+    CODES = {'fra': 'fra_Latn', 'eng': 'eng_Latn', 'xxx': 'xxx_Unkn'}
+
+    def predict(self, lines, k=1):
+        labels = [(f"__label__{self.CODES[line.split()[0]]}",) for line in lines]
+        return labels, [[0.9] for _ in lines]
+
+
+def window(language: str, count: int) -> list[str]:
+    return [f"{language} segment de test assez long numéro {idx}" for idx in range(count)]
+
+
+class LanguageDetectorTest(unittest.TestCase):
+    def setUp(self):
+        self.detector = LanguageDetector(['fra_Latn', 'eng_Latn'], min_confidence=0.5, min_chars=20)
+        self.detector.model = StubModel()
+
+    def test_short_segment_takes_majority_of_call(self):
+        languages = self.detector.detect(window('fra', 3) + window('eng', 1) + ['eng court'])
+        self.assertEqual(languages, ['fra_Latn'] * 3 + ['eng_Latn', 'fra_Latn'])
+
+    def test_document_majority_spans_windows(self):
+        self.detector.detect(window('fra', 10))
+        # Fenêtre courte dans une autre langue (citation) : ne change pas la langue du document
+        self.detector.detect(window('eng', 2))
+        self.assertEqual(self.detector.document_language, 'fra_Latn')
+        self.assertEqual(self.detector.detect(['xxx inconnu']), ['fra_Latn'])
+
+        self.detector.detect(window('eng', 20))
+        self.assertEqual(self.detector.document_language, 'eng_Latn')
+
+    def test_unsupported_language_without_fallback(self):
+        self.assertEqual(self.detector.detect(['xxx inconnu']), [None])
+        self.assertEqual(self.detector.detect(['xxx inconnu'], default='eng_Latn'), ['eng_Latn'])
+
+
+if __name__ == '__main__':
+    unittest.main()